@@ -0,0 +1,239 @@
+"""Banc d'essai sans interface des étapes du pipeline sur des jeux synthétiques.
+
+Exemple : python -m backend.benchmark --sizes 10000,100000,1000000 -o bench.json --baseline baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+# Mesures à froid : cache disque des lectures désactivé, même s'il est configuré
+# (à fixer avant l'import du chargeur)
+CONFIGURED_CACHE_DIR = os.environ.get("HEVITRA_CACHE_DIR", "")
+os.environ["HEVITRA_CACHE_DIR"] = ""
+
+import numpy as np
+import pandas as pd
+
+from backend.cache import get_shared_cache
+from backend.correlation import correlation_matrix
+from backend.cube import Cube
+from backend.data_analysis import OutlierMask, detect_anomalies, get_profile
+from backend.data_loader import PYARROW_AVAILABLE, ingest
+from backend.export import write_export
+from backend.filters import FilterEngine, FilteredView
+from backend.perf import PerfRecorder, stage
+from backend.synthetic import generate_dataset
+
+try:
+    import sklearn  # noqa: F401
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+# Régression : plus lent que la référence de plus de THRESHOLD (ratio) et de plus de MIN_SECONDS
+THRESHOLD = 0.25
+MIN_SECONDS = 0.05
+WARMUP_ROWS = 1_000
+# Écart maximal toléré entre `correlation_matrix` et `DataFrame.corr` (NaN et grandes valeurs compris)
+CORRELATION_TOLERANCE = 1e-4
+
+
+def run_stages(df, csv_bytes, recorder, workdir):
+    """Exécute chaque étape une fois, caches vidés : chaque mesure part à froid"""
+    cache = get_shared_cache()
+    n_rows = len(df)
+
+    def measure(name):
+        cache.clear()
+        return stage(name, n_rows, recorder=recorder)
+
+    with measure('ingestion'):
+        key, data, _ = ingest(csv_bytes, 'benchmark.csv', detect_types=True, encode=True)
+    with measure('profil'):
+        profile = get_profile(data, key)
+    numeric = profile.numeric_columns
+    categorical = profile.categorical_columns
+    with measure('anomalies'):
+        detect_anomalies(data, numeric, OutlierMask(data, numeric))
+    with measure('filtrage'):
+        engine = FilterEngine(data)
+        low, high = data['Ventes'].quantile([0.25, 0.75])
+        view = engine.apply([
+            ('range', 'Ventes', low, high),
+            ('isin', 'Region', tuple(engine.categories('Region')[:2])),
+        ])
+    if SKLEARN_AVAILABLE:
+        from backend.clustering import perform_clustering
+        with measure('clustering'):
+            perform_clustering(data, ['Ventes', 'Clients'], 3)
+    with measure('tableau croisé'):
+        dimensions = categorical[:2]
+        cube = Cube(data[dimensions + numeric[:2]], dimensions, numeric[:2])
+        cube.pivot(dimensions[0], dimensions[1], numeric[:2], ['mean', 'sum', 'count'], margins=True)
+    with measure('corrélation'):
+        correlation = correlation_matrix(data[numeric])
+    with measure('export csv'):
+        write_export(view, 'csv', os.path.join(workdir, 'export.csv'))
+    if PYARROW_AVAILABLE:
+        with measure('export parquet'):
+            write_export(FilteredView(data), 'parquet', os.path.join(workdir, 'export.parquet'))
+    cache.clear()
+    return {'corrélation': check_correlation(data[numeric], correlation)}
+
+
+def check_correlation(frame, correlation):
+    """Écart maximal avec `DataFrame.corr` ; les NaN doivent coïncider"""
+    expected = frame.corr().to_numpy()
+    actual = correlation.to_numpy(dtype='float64')
+    if not np.array_equal(np.isnan(expected), np.isnan(actual)):
+        # Écart maximal possible entre deux corrélations
+        return 2.0
+    return float(np.nanmax(np.abs(expected - actual), initial=0.0))
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, repeat=1, progress=print, **dataset_options):
+    """Meilleur temps (sur `repeat` passes) de chaque étape pour chaque taille.
+
+    Retourne (résultats, écarts des contrôles d'exactitude par taille).
+    """
+    results, checks = {}, {}
+    with tempfile.TemporaryDirectory(prefix='hevitra-bench-') as workdir:
+        # Passe d'échauffement (imports paresseux, premiers appels) hors mesures
+        warmup = generate_dataset(WARMUP_ROWS, **dataset_options)
+        run_stages(warmup, warmup.to_csv(index=False).encode('utf-8'), PerfRecorder(), workdir)
+        for n_rows in sizes:
+            t = time.perf_counter()
+            df = generate_dataset(n_rows, **dataset_options)
+            csv_bytes = df.to_csv(index=False).encode('utf-8')
+            progress(f"{n_rows:,} lignes : jeu généré en {time.perf_counter() - t:.1f} s "
+                     f"({len(csv_bytes) / 1024 ** 2:.0f} Mo de CSV)")
+            recorder = PerfRecorder()
+            recorder.begin_run('benchmark')
+            for _ in range(repeat):
+                checks[str(n_rows)] = run_stages(df, csv_bytes, recorder, workdir)
+            best = {}
+            for record in recorder.last_run('benchmark'):
+                current = best.get(record.name)
+                if current is None or record.seconds < current['seconds']:
+                    best[record.name] = {
+                        'seconds': record.seconds,
+                        'rows_per_second': n_rows / record.seconds if record.seconds else 0.0,
+                        'memory': record.memory,
+                    }
+            results[str(n_rows)] = best
+            progress('  ' + ' • '.join(f"{name} {values['seconds']:.3f} s" for name, values in best.items()))
+    return results, checks
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def compare(results, baseline, threshold=THRESHOLD, min_seconds=MIN_SECONDS):
+    """Écarts à la référence : liste de dicts (taille, étape, durées, ratio, régression).
+
+    La référence peut fixer un seuil par étape : {"thresholds": {"clustering": 0.5}}.
+    """
+    thresholds = baseline.get('thresholds', {})
+    rows = []
+    for size, stages in results.items():
+        for name, values in stages.items():
+            reference = baseline.get('results', {}).get(size, {}).get(name)
+            if reference is None:
+                continue
+            limit = thresholds.get(name, threshold)
+            ratio = values['seconds'] / reference['seconds'] if reference['seconds'] else 1.0
+            rows.append({
+                'size': size,
+                'stage': name,
+                'seconds': values['seconds'],
+                'baseline': reference['seconds'],
+                'ratio': ratio,
+                'regression': ratio > 1 + limit and values['seconds'] - reference['seconds'] > min_seconds,
+            })
+    return rows
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="HevitraVizor+ : banc d'essai des étapes du pipeline")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Tailles en lignes, séparées par des virgules (10 000 à 10 000 000)")
+    parser.add_argument('--columns', type=int, default=6, help="Nombre de colonnes")
+    parser.add_argument('--cardinality', type=int, default=4, help="Modalités par colonne catégorielle")
+    parser.add_argument('--null-rate', type=float, default=0.01, help="Part de cellules manquantes")
+    parser.add_argument('--duplicate-rate', type=float, default=0.01, help="Part de lignes dupliquées")
+    parser.add_argument('--outlier-rate', type=float, default=0.005, help="Part de valeurs aberrantes")
+    parser.add_argument('--span-days', type=int, default=365, help="Période couverte par la colonne Date")
+    parser.add_argument('--repeat', type=int, default=1, help="Passes par taille (meilleur temps retenu)")
+    parser.add_argument('-o', '--output', default='benchmark.json', help="Fichier JSON des résultats")
+    parser.add_argument('--baseline', default=None, help="Référence JSON à comparer")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="Ralentissement toléré (0.25 : +25 %%) avant de signaler une régression")
+    parser.add_argument('--save-baseline', action='store_true', help="Enregistre les résultats comme référence")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    dataset_options = {
+        'n_columns': args.columns,
+        'cardinality': args.cardinality,
+        'null_rate': args.null_rate,
+        'duplicate_rate': args.duplicate_rate,
+        'outlier_rate': args.outlier_rate,
+        'span_days': args.span_days,
+    }
+    if CONFIGURED_CACHE_DIR:
+        print(f"Cache disque ({CONFIGURED_CACHE_DIR}) ignoré : lectures mesurées à froid")
+    results, checks = run_benchmark(sizes, repeat=args.repeat, **dataset_options)
+    report = {
+        'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'environment': environment(),
+        'dataset': dataset_options,
+        'results': results,
+        'checks': checks,
+    }
+
+    status = 0
+    for size, deviations in checks.items():
+        for name, deviation in deviations.items():
+            if deviation > CORRELATION_TOLERANCE:
+                print(f"✗ {int(size):>10,} {name} : écart de {deviation:.2e} avec DataFrame.corr")
+                status = 1
+    if args.baseline and not args.save_baseline and not os.path.exists(args.baseline):
+        print(f"Référence introuvable ({args.baseline}) : comparaison ignorée")
+    elif args.baseline and not args.save_baseline:
+        with open(args.baseline, encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        comparison = compare(results, baseline, args.threshold)
+        report['comparison'] = comparison
+        for row in comparison:
+            flag = '✗' if row['regression'] else '✓'
+            print(f"{flag} {int(row['size']):>10,} {row['stage']:<16} {row['seconds']:8.3f} s "
+                  f"(référence {row['baseline']:.3f} s, ×{row['ratio']:.2f})")
+        regressions = [row for row in comparison if row['regression']]
+        print(f"{len(regressions)} régression(s) sur {len(comparison)} mesures comparées")
+        status = 1 if regressions else status
+
+    with open(args.output, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, ensure_ascii=False, indent=2)
+    if args.save_baseline and args.baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, ensure_ascii=False, indent=2)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,338 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Budget mémoire par défaut du cache partagé (en Mo), ajustable par variable d'environnement
+DEFAULT_CACHE_MB = int(os.environ.get("HEVITRA_CACHE_MB", "1024"))
+# Une session sans exécution depuis ce délai (en secondes) libère ses références
+SESSION_TTL = int(os.environ.get("HEVITRA_SESSION_TTL", "1800"))
+
+
+def estimate_size(obj, _seen=None):
+    """Estimation de l'empreinte mémoire d'un objet mis en cache (en octets).
+
+    Les attributs listés dans `shared_attributes` (jeu de données d'origine par exemple)
+    ne sont pas comptés : ils appartiennent à une autre entrée.
+    """
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    _seen = set() if _seen is None else _seen
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    if isinstance(obj, (tuple, list, set)):
+        return sys.getsizeof(obj) + sum(estimate_size(item, _seen) for item in obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(v, _seen) for v in obj.values())
+    if hasattr(obj, '__dict__') and not isinstance(obj, type):
+        shared = getattr(obj, 'shared_attributes', ())
+        return sys.getsizeof(obj) + sum(estimate_size(v, _seen) for name, v in vars(obj).items()
+                                        if name not in shared)
+    return sys.getsizeof(obj)
+
+
+class SessionUsage:
+    """Clés référencées par une session : accès des deux dernières exécutions et objets conservés"""
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.current = set()
+        self.previous = set()
+        self.held = {}
+        self.runs = 0
+        self.last_seen = time.time()
+
+    def __contains__(self, key):
+        return key in self.current or key in self.previous or key in self.held.values()
+
+    def referenced(self):
+        return self.current | self.previous | set(self.held.values())
+
+
+class MemoryLRU:
+    """Cache LRU borné par un budget mémoire (octets) et non par un nombre d'entrées.
+
+    Les entrées référencées par une session active ne sont pas évincées : une session
+    référence les clés lues pendant ses deux dernières exécutions et celles qu'elle conserve
+    explicitement (`hold`). Le budget peut donc être dépassé tant que ces références durent.
+    """
+
+    def __init__(self, max_bytes, session_ttl=SESSION_TTL):
+        self.max_bytes = int(max_bytes)
+        self.session_ttl = session_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._refs = {}
+        self._sessions = {}
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self._track(key)
+            return self._entries[key][0]
+
+    def put(self, key, value, size=None):
+        size = estimate_size(value) if size is None else int(size)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            # Un objet plus gros que le budget complet n'est pas conservé
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            self._track(key)
+            self._evict()
+        return value
+
+    def get_or_compute(self, key, func):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.put(key, func())
+        return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            value, size = self._entries.pop(key)
+            self.current_bytes -= size
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'pinned_bytes': sum(size for key, (_, size) in self._entries.items() if key in self._refs),
+                'sessions': len(self._sessions),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    # --- Références par session ---
+
+    def _incref(self, key):
+        self._refs[key] = self._refs.get(key, 0) + 1
+
+    def _decref(self, key):
+        self._refs[key] -= 1
+        if not self._refs[key]:
+            del self._refs[key]
+
+    def _track(self, key):
+        # Clé lue ou calculée par la session de l'exécution en cours (thread du script)
+        usage = self._sessions.get(getattr(_context, 'session', None))
+        if usage is None or key in usage.current:
+            return
+        if key not in usage:
+            self._incref(key)
+        usage.current.add(key)
+
+    def _release(self, usage, before):
+        for key in before - usage.referenced():
+            self._decref(key)
+
+    def begin_run(self, session_id):
+        """Nouvelle exécution d'une session : les clés lues deux exécutions plus tôt sont libérées"""
+        with self._lock:
+            self.expire_sessions()
+            usage = self._sessions.get(session_id)
+            if usage is None:
+                usage = self._sessions[session_id] = SessionUsage(session_id)
+            before = usage.referenced()
+            usage.previous, usage.current = usage.current, set()
+            usage.runs += 1
+            usage.last_seen = time.time()
+            self._release(usage, before)
+            self._evict()
+            return usage
+
+    def hold(self, session_id, name, key):
+        """Conserve `key` pour la session sous le nom `name` (None : libère l'objet conservé)"""
+        with self._lock:
+            usage = self._sessions.get(session_id)
+            if usage is None:
+                return
+            before = usage.referenced()
+            if key is None:
+                usage.held.pop(name, None)
+            else:
+                if key not in usage:
+                    self._incref(key)
+                usage.held[name] = key
+            self._release(usage, before)
+
+    def end_session(self, session_id):
+        with self._lock:
+            usage = self._sessions.pop(session_id, None)
+            if usage is not None:
+                for key in usage.referenced():
+                    self._decref(key)
+                self._evict()
+
+    def expire_sessions(self):
+        """Libère les sessions inactives (onglet fermé : Streamlit ne le signale pas)"""
+        with self._lock:
+            limit = time.time() - self.session_ttl
+            for session_id in [s for s, u in self._sessions.items() if u.last_seen < limit]:
+                self.end_session(session_id)
+
+    def session_stats(self):
+        """Mémoire par session : entrées référencées, octets référencés et part attribuée.
+
+        La part attribuée divise chaque entrée entre les sessions qui la référencent ;
+        la somme des parts est égale à la mémoire des entrées référencées.
+        """
+        now = time.time()
+        with self._lock:
+            rows = []
+            for usage in self._sessions.values():
+                keys = [k for k in usage.referenced() if k in self._entries]
+                sizes = [self._entries[k][1] for k in keys]
+                rows.append({
+                    'session': usage.session_id,
+                    'entries': len(keys),
+                    'bytes': sum(sizes),
+                    'shared_bytes': sum(size / self._refs[k] for k, size in zip(keys, sizes)),
+                    'exclusive_bytes': sum(size for k, size in zip(keys, sizes) if self._refs[k] == 1),
+                    'runs': usage.runs,
+                    'idle': now - usage.last_seen,
+                })
+            return rows
+
+    def usage_by_kind(self):
+        """Entrées et octets par type d'entrée (premier élément de la clé)"""
+        with self._lock:
+            usage = {}
+            for key, (_, size) in self._entries.items():
+                kind = key[0] if isinstance(key, tuple) else str(key)
+                entries, total, pinned = usage.get(kind, (0, 0, 0))
+                usage[kind] = (entries + 1, total + size, pinned + (size if key in self._refs else 0))
+            return usage
+
+    def _evict(self):
+        if self.current_bytes <= self.max_bytes:
+            return
+        # Ordre LRU ; les entrées référencées par une session sont conservées
+        for key in [k for k in self._entries if k not in self._refs]:
+            if self.current_bytes <= self.max_bytes:
+                break
+            self.current_bytes -= self._entries.pop(key)[1]
+            self.evictions += 1
+
+
+_MISSING = object()
+_shared_cache = None
+_shared_lock = threading.Lock()
+# Session de l'exécution en cours, propre au thread du script Streamlit
+_context = threading.local()
+
+
+def get_shared_cache():
+    """Cache unique au processus, partagé par toutes les sessions Streamlit"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = MemoryLRU(DEFAULT_CACHE_MB * 1024 ** 2)
+        return _shared_cache
+
+
+def set_session(session_id, new_run=True):
+    """Rattache les accès au cache du thread courant à une session.
+
+    `new_run` démarre une nouvelle exécution complète ; une section réexécutée seule
+    (fragment) garde les références de l'exécution en cours.
+    """
+    _context.session = session_id
+    if new_run:
+        return get_shared_cache().begin_run(session_id)
+
+
+def current_session():
+    return getattr(_context, 'session', None)
+
+
+def touch(path):
+    """Date de modification utilisée comme date de dernier accès d'un fichier en cache"""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _directory_entries(directory):
+    # Fichiers regroupés par entrée (fichier et sa fiche JSON) : (dernier accès, octets, chemins)
+    entries = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(('.tmp', '.part')):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entry = entries.setdefault(path.removesuffix('.json'), [0.0, 0, []])
+            entry[0] = max(entry[0], stat.st_mtime)
+            entry[1] += stat.st_size
+            entry[2].append(path)
+    return sorted(entries.values())
+
+
+def trim_directory(directory, max_bytes):
+    """Cache disque borné : supprime les entrées les moins récemment utilisées au-delà de `max_bytes`"""
+    if not os.path.isdir(directory):
+        return
+    entries = _directory_entries(directory)
+    total = sum(size for _, size, _ in entries)
+    for _, size, paths in entries:
+        if total <= max_bytes:
+            break
+        for path in paths:
+            try:
+                os.remove(path)
+                # Sous-répertoire vidé (colonnes d'un chargement paresseux par exemple)
+                if os.path.dirname(path) != directory and not os.listdir(os.path.dirname(path)):
+                    os.rmdir(os.path.dirname(path))
+            except OSError:
+                pass
+        total -= size
+
+
+def derive_key(parent, *operations):
+    """Empreinte d'un jeu de données dérivé d'un autre par une suite d'opérations"""
+    payload = repr((parent,) + operations).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from backend.cache import get_shared_cache
+
+# Nombre maximal de points envoyés au navigateur par graphique
+DEFAULT_POINT_BUDGET = 50_000
+
+# Stratégies de découpage acceptées par `np.histogram_bin_edges`
+BIN_STRATEGIES = ['auto', 'fd', 'sturges', 'sqrt', 'scott', 'doane', 'rice']
+MAX_BINS = 500
+
+
+def _as_float(values):
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype('int64').to_numpy(dtype='float64')
+    return values.to_numpy(dtype='float64', na_value=np.nan)
+
+
+def lttb(x, y, n_out):
+    """Indices retenus par Largest-Triangle-Three-Buckets (x trié, sans valeurs manquantes)"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    every = (n - 2) / (n_out - 2)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        # Point moyen du bucket suivant (le dernier point pour le dernier bucket)
+        avg_x = x[end:next_end].mean() if next_end > end else x[-1]
+        avg_y = y[end:next_end].mean() if next_end > end else y[-1]
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def sampling_caption(shown, total):
+    if shown >= total:
+        return f"Affichage : {total:,} points (résolution complète)"
+    return f"Affichage : {shown:,} / {total:,} points ({shown / total:.1%})"
+
+
+def line_figure(x, y, title, point_budget=DEFAULT_POINT_BUDGET, color='#3498db'):
+    """Courbe WebGL, réduite par LTTB au-delà du budget de points"""
+    x = pd.Series(x).reset_index(drop=True)
+    y = pd.Series(y).reset_index(drop=True)
+    valid = (x.notna() & y.notna()).to_numpy()
+    x, y = x[valid], y[valid]
+    keep = lttb(_as_float(x), _as_float(y), point_budget)
+    fig = go.Figure(go.Scattergl(x=x.iloc[keep], y=y.iloc[keep], mode='lines', line=dict(color=color)))
+    fig.update_layout(title=title, xaxis_title=x.name, yaxis_title=y.name)
+    return fig, sampling_caption(len(keep), len(x))
+
+
+def scatter_figure(df, x_col, y_col, title, color=None, color_label='Cluster',
+                   point_budget=DEFAULT_POINT_BUDGET, color_discrete_sequence=None,
+                   bins=200, random_state=42):
+    """Nuage de points WebGL ; au-delà du budget : densité 2D (sans couleur) ou échantillon (avec couleur)"""
+    frame = df[[x_col, y_col]].copy()
+    if color is not None:
+        frame['_color'] = np.asarray(color)
+    frame = frame.dropna()
+    total = len(frame)
+
+    if total > point_budget and color is None:
+        counts, x_edges, y_edges = np.histogram2d(_as_float(frame[x_col]), _as_float(frame[y_col]), bins=bins)
+        fig = go.Figure(go.Heatmap(
+            z=np.where(counts.T > 0, counts.T, np.nan),
+            x=(x_edges[:-1] + x_edges[1:]) / 2,
+            y=(y_edges[:-1] + y_edges[1:]) / 2,
+            colorscale='Blues', colorbar=dict(title='Points'),
+        ))
+        fig.update_layout(title=title, xaxis_title=x_col, yaxis_title=y_col)
+        return fig, f"Densité 2D : {total:,} points agrégés en {bins}×{bins} cellules"
+
+    if total > point_budget:
+        frame = frame.sample(n=point_budget, random_state=random_state)
+    fig = px.scatter(
+        frame, x=x_col, y=y_col, title=title, render_mode='webgl',
+        color='_color' if color is not None else None,
+        color_continuous_scale='viridis',
+        color_discrete_sequence=color_discrete_sequence,
+        labels={'_color': color_label},
+    )
+    return fig, sampling_caption(len(frame), total)
+
+
+def _finite(values):
+    values = _as_float(values)
+    return values[np.isfinite(values)]
+
+
+def histogram_data(values, bins='auto'):
+    """Comptes et bornes des classes calculés côté serveur"""
+    values = _finite(values)
+    if not len(values):
+        return np.zeros(0, dtype=np.int64), np.zeros(1)
+    edges = np.histogram_bin_edges(values, bins=bins)
+    if len(edges) > MAX_BINS + 1:
+        edges = np.histogram_bin_edges(values, bins=MAX_BINS)
+    counts, edges = np.histogram(values, bins=edges)
+    return counts, edges
+
+
+def box_data(values, max_outliers=500, random_state=42):
+    """Quartiles, moustaches (1.5 × IQR) et échantillon des valeurs aberrantes"""
+    values = _finite(values)
+    if not len(values):
+        return None
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = (values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)
+    outliers = values[~inside]
+    n_outliers = len(outliers)
+    if n_outliers > max_outliers:
+        outliers = np.random.default_rng(random_state).choice(outliers, max_outliers, replace=False)
+    return {
+        'q1': q1, 'median': median, 'q3': q3,
+        'lowerfence': values[inside].min(), 'upperfence': values[inside].max(),
+        'outliers': outliers, 'n_outliers': n_outliers, 'count': len(values),
+    }
+
+
+def get_histogram(view, fingerprint, col, bins='auto'):
+    """Histogramme mis en cache par (jeu de données, état des filtres, colonne, binning)"""
+    return get_shared_cache().get_or_compute(
+        ('histogram', fingerprint, view.key, col, bins),
+        lambda: histogram_data(view.column(col), bins),
+    )
+
+
+def get_box(view, fingerprint, col):
+    """Statistiques de boîte mises en cache par (jeu de données, état des filtres, colonne)"""
+    return get_shared_cache().get_or_compute(
+        ('box', fingerprint, view.key, col), lambda: box_data(view.column(col)),
+    )
+
+
+def histogram_figure(counts, edges, col, title, color='#3498db'):
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+        marker=dict(color=color), name=col,
+    ))
+    fig.update_layout(title=title, xaxis_title=col, yaxis_title='count', bargap=0)
+    return fig
+
+
+def box_figure(stats, col, title, color='#2ecc71'):
+    fig = go.Figure(go.Box(
+        q1=[stats['q1']], median=[stats['median']], q3=[stats['q3']],
+        lowerfence=[stats['lowerfence']], upperfence=[stats['upperfence']],
+        x=[col], name=col, marker=dict(color=color), boxpoints=False,
+    ))
+    if len(stats['outliers']):
+        fig.add_trace(go.Scatter(
+            x=[col] * len(stats['outliers']), y=stats['outliers'], mode='markers',
+            marker=dict(color=color, size=4), name='Valeurs aberrantes', showlegend=False,
+        ))
+    fig.update_layout(title=title, yaxis_title=col)
+    return fig
+
+
+def forecast_figure(history, forecast, lower, upper, title, point_budget=DEFAULT_POINT_BUDGET):
+    """Historique (réduit par LTTB), prévision et intervalle de confiance"""
+    fig, caption = line_figure(history.index.to_series(name='Date'), history, title, point_budget)
+    fig.data[0].name = 'Historique'
+    fig.add_trace(go.Scatter(x=upper.index, y=upper, mode='lines', line=dict(width=0),
+                             showlegend=False, hoverinfo='skip'))
+    fig.add_trace(go.Scatter(x=lower.index, y=lower, mode='lines', line=dict(width=0),
+                             fill='tonexty', fillcolor='rgba(231, 76, 60, 0.2)', name='Intervalle'))
+    fig.add_trace(go.Scatter(x=forecast.index, y=forecast, mode='lines',
+                             line=dict(color='#e74c3c', dash='dash'), name='Prévision'))
+    return fig, caption
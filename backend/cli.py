@@ -0,0 +1,102 @@
+"""Analyse par lots sans interface.
+
+Exemple : python -m backend.cli donnees/*.csv rapports/mensuel.xlsx -o sorties --clusters 3
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from backend.cache import get_shared_cache
+from backend.pipeline import json_default, analyse_file
+
+EXTENSIONS = ('.csv', '.xlsx', '.xls')
+
+
+def collect_files(inputs):
+    """Fichiers CSV / Excel désignés par des répertoires, des motifs glob ou des chemins"""
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = sorted(glob.glob(os.path.join(item, '*')))
+        else:
+            candidates = sorted(glob.glob(item)) or [item]
+        files += [f for f in candidates if f.lower().endswith(EXTENSIONS) and os.path.isfile(f)]
+    return list(dict.fromkeys(files))
+
+
+def _run(path, options):
+    # Exécuté dans un processus du pool : une erreur n'interrompt pas le lot.
+    # Cache vidé à chaque fichier : un contenu déjà traité par ce processus ne fausse pas
+    # les débits mesurés (et la mémoire ne s'accumule pas d'un fichier à l'autre)
+    get_shared_cache().clear()
+    try:
+        return analyse_file(path, **options)
+    except Exception as e:
+        return {'file': os.path.basename(path), 'path': os.path.abspath(path), 'error': str(e)}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="HevitraVizor+ : analyse par lots de fichiers CSV / Excel")
+    parser.add_argument('inputs', nargs='+', help="Fichiers, répertoires ou motifs glob")
+    parser.add_argument('-o', '--output', default='hevitravizor_sorties', help="Répertoire des sorties")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Nombre de processus")
+    parser.add_argument('--clusters', type=int, default=None, help="Nombre de clusters (K-means) ; aucun par défaut")
+    parser.add_argument('--no-clean', action='store_true', help="Désactive le nettoyage automatique")
+    parser.add_argument('--no-types', action='store_true', help="Désactive la détection automatique des types")
+    parser.add_argument('--formats', default='json,html,parquet', help="Sorties par fichier : json, html, parquet")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    files = collect_files(args.inputs)
+    if not files:
+        print("Aucun fichier CSV / Excel trouvé", file=sys.stderr)
+        return 2
+    options = {
+        'output_dir': args.output,
+        'clean': not args.no_clean,
+        'detect_types': not args.no_types,
+        'n_clusters': args.clusters,
+        'formats': tuple(f.strip() for f in args.formats.split(',') if f.strip()),
+    }
+
+    started = time.perf_counter()
+    results = []
+    workers = args.workers or min(len(files), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run, path, options) for path in files]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if 'error' in result:
+                print(f"✗ {result['file']} : {result['error']}")
+            else:
+                print(f"✓ {result['file']} → {result['output']} : {result['rows']:,} lignes en {result['elapsed']:.2f} s "
+                      f"({result['rows_per_second']:,.0f} lignes/s, {result['mb_per_second']:.1f} Mo/s)")
+
+    elapsed = time.perf_counter() - started
+    succeeded = [r for r in results if 'error' not in r]
+    total_rows = sum(r['rows'] for r in succeeded)
+    total_mb = sum(r['bytes'] for r in succeeded) / 1024 ** 2
+    print(f"{len(succeeded)}/{len(files)} fichiers, {total_rows:,} lignes en {elapsed:.2f} s "
+          f"({total_rows / elapsed:,.0f} lignes/s, {total_mb / elapsed:.1f} Mo/s)")
+
+    os.makedirs(args.output, exist_ok=True)
+    batch = {
+        'elapsed': elapsed,
+        'workers': workers,
+        'files': [{k: r.get(k) for k in ('file', 'path', 'output', 'error', 'rows', 'bytes', 'elapsed', 'rows_per_second',
+                                         'mb_per_second', 'timings', 'perf') if k in r} for r in results],
+    }
+    with open(os.path.join(args.output, 'lot.json'), 'w', encoding='utf-8') as handle:
+        json.dump(batch, handle, ensure_ascii=False, indent=2, default=json_default)
+    return 0 if len(succeeded) == len(files) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from backend.cache import get_shared_cache
+from backend.perf import timed
+
+# Au-delà : MiniBatchKMeans ; au-delà du second seuil : apprentissage sur échantillon
+MINIBATCH_ROWS = 100_000
+SAMPLE_FIT_ROWS = 2_000_000
+SAMPLE_SIZE = 200_000
+# Taille de l'échantillon pour le score de silhouette (coût quadratique)
+SILHOUETTE_SAMPLE = 5_000
+# Affectation des lignes par blocs : progression et point d'annulation entre deux blocs
+PREDICT_CHUNK_ROWS = 500_000
+
+
+def prepare_features(df, numerical_columns):
+    """Matrice float32 et masque des lignes complètes (sans valeur manquante)"""
+    X = df[list(numerical_columns)].to_numpy(dtype='float32', na_value=np.nan)
+    complete = ~np.isnan(X).any(axis=1)
+    return X, complete
+
+
+def choose_method(n_rows):
+    if n_rows > SAMPLE_FIT_ROWS:
+        return 'sample'
+    if n_rows > MINIBATCH_ROWS:
+        return 'minibatch'
+    return 'kmeans'
+
+
+def fit_model(X, n_clusters, method, random_state=42):
+    """Standardisation + K-means adapté au volume ; retourne (scaler, modèle, lignes d'apprentissage)"""
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+    from sklearn.preprocessing import StandardScaler
+
+    X_fit = X
+    if method == 'sample':
+        rng = np.random.default_rng(random_state)
+        X_fit = X[rng.choice(len(X), SAMPLE_SIZE, replace=False)]
+    scaler = StandardScaler().fit(X_fit)
+    X_scaled = scaler.transform(X_fit)
+
+    if method == 'kmeans':
+        model = KMeans(n_clusters=n_clusters, random_state=random_state, n_init=10)
+    else:
+        model = MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state,
+                                batch_size=4096, n_init=3)
+    model.fit(X_scaled)
+    return scaler, model, len(X_fit)
+
+
+def _model_key(fingerprint, numerical_columns, n_clusters):
+    return ('cluster_model', fingerprint, tuple(numerical_columns), n_clusters)
+
+
+def clustering_key(fingerprint, numerical_columns, n_clusters):
+    """Clé du résultat de clustering dans le cache partagé"""
+    return ('clustering', fingerprint, tuple(numerical_columns), n_clusters)
+
+
+def predict_labels(scaler, model, X, progress_callback=None):
+    """Cluster de chaque ligne, calculé par blocs"""
+    labels = np.empty(len(X), dtype=np.int32)
+    for start in range(0, len(X), PREDICT_CHUNK_ROWS):
+        stop = start + PREDICT_CHUNK_ROWS
+        labels[start:stop] = model.predict(scaler.transform(X[start:stop]))
+        if progress_callback is not None:
+            progress_callback(min(stop, len(X)) / len(X))
+    return labels
+
+
+@timed()
+def perform_clustering(df, numerical_columns, n_clusters=3, fingerprint=None, progress_callback=None):
+    """Clustering K-means adapté au volume, avec modèle mis en cache.
+
+    Retourne un dict : labels alignés sur les lignes de `df` (-1 pour les lignes
+    incomplètes), scaler, modèle, méthode et nombre de lignes d'apprentissage.
+    `progress_callback(fraction)` est appelé entre les étapes et les blocs d'affectation
+    (une exception qu'il lève interrompt le calcul).
+    """
+    def report(fraction):
+        if progress_callback is not None:
+            progress_callback(fraction)
+
+    def compute():
+        report(0.0)
+        X, complete = prepare_features(df, numerical_columns)
+        X_complete = X[complete]
+        method = choose_method(len(X_complete))
+        report(0.1)
+        if fingerprint is None:
+            scaler, model, fit_rows = fit_model(X_complete, n_clusters, method)
+        else:
+            # Modèle éventuellement déjà ajusté par un balayage de k
+            scaler, model, fit_rows = get_shared_cache().get_or_compute(
+                _model_key(fingerprint, numerical_columns, n_clusters),
+                lambda: fit_model(X_complete, n_clusters, method),
+            )
+        report(0.5)
+
+        labels = np.full(len(df), -1, dtype=np.int32)
+        labels[complete] = predict_labels(scaler, model, X_complete, lambda f: report(0.5 + 0.5 * f))
+        return {
+            'labels': labels,
+            'scaler': scaler,
+            'model': model,
+            'method': method,
+            'fit_rows': fit_rows,
+            'n_rows': int(complete.sum()),
+        }
+
+    if fingerprint is None:
+        return compute()
+    return get_shared_cache().get_or_compute(clustering_key(fingerprint, numerical_columns, n_clusters), compute)
+
+
+def cluster_counts(labels):
+    """Effectifs par cluster (hors lignes non affectées)"""
+    return pd.Series(labels[labels >= 0]).value_counts().sort_index()
+
+
+_sweep_data = {}
+
+
+def _init_sweep_worker(X, silhouette_rows):
+    # Données transmises une seule fois par processus et non à chaque tâche
+    _sweep_data['X'] = X
+    _sweep_data['silhouette_rows'] = silhouette_rows
+
+
+def _fit_for_k(n_clusters, method):
+    from sklearn.metrics import silhouette_score
+
+    X = _sweep_data['X']
+    scaler, model, fit_rows = fit_model(X, n_clusters, method)
+    sample = scaler.transform(X[_sweep_data['silhouette_rows']])
+    sample_labels = model.predict(sample)
+    silhouette = np.nan
+    if len(np.unique(sample_labels)) > 1:
+        silhouette = float(silhouette_score(sample, sample_labels))
+    return n_clusters, float(model.inertia_), silhouette, (scaler, model, fit_rows)
+
+
+def elbow_k(ks, inertias):
+    """Coude : point le plus éloigné de la corde reliant les extrémités de la courbe"""
+    x = np.asarray(ks, dtype='float64')
+    y = np.asarray(inertias, dtype='float64')
+    x_norm = (x - x.min()) / (np.ptp(x) or 1)
+    y_norm = (y - y.min()) / (np.ptp(y) or 1)
+    distances = np.abs(y_norm[0] + (y_norm[-1] - y_norm[0]) * x_norm - y_norm)
+    return int(x[np.argmax(distances)])
+
+
+@timed()
+def sweep_k(df, numerical_columns, ks=range(2, 11), fingerprint=None, max_workers=None, progress_callback=None):
+    """Ajuste K-means pour chaque k en parallèle (pool de processus).
+
+    Retourne un DataFrame (k, inertie, silhouette sur échantillon), le k recommandé
+    (meilleure silhouette) et le k du coude. Les modèles ajustés alimentent le cache
+    de `perform_clustering`. `progress_callback(fraction)` est appelé à chaque k terminé ;
+    s'il lève une exception, les ajustements non démarrés sont abandonnés.
+    """
+    X, complete = prepare_features(df, numerical_columns)
+    X = X[complete]
+    method = choose_method(len(X))
+    rng = np.random.default_rng(42)
+    silhouette_rows = rng.choice(len(X), min(SILHOUETTE_SAMPLE, len(X)), replace=False)
+    ks = list(ks)
+    max_workers = max_workers or min(len(ks), os.cpu_count() or 1)
+
+    # Lancé depuis un thread de tâche d'un serveur multithread : pas de fork (verrous et
+    # threads BLAS/OpenMP hérités à l'état courant), processus neufs via forkserver ou spawn
+    start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(start_method),
+                             initializer=_init_sweep_worker, initargs=(X, silhouette_rows)) as pool:
+        futures = [pool.submit(_fit_for_k, k, method) for k in ks]
+        results = []
+        try:
+            for future in as_completed(futures):
+                results.append(future.result())
+                if progress_callback is not None:
+                    progress_callback(len(results) / len(ks))
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    results.sort(key=lambda result: result[0])
+
+    rows = []
+    for n_clusters, inertia, silhouette, fitted in results:
+        if fingerprint is not None:
+            get_shared_cache().put(_model_key(fingerprint, numerical_columns, n_clusters), fitted)
+        rows.append({'k': n_clusters, 'inertie': inertia, 'silhouette': silhouette})
+    sweep = pd.DataFrame(rows)
+    recommended = int(sweep.loc[sweep['silhouette'].idxmax(), 'k']) if sweep['silhouette'].notna().any() \
+        else elbow_k(sweep['k'], sweep['inertie'])
+    return sweep, recommended, elbow_k(sweep['k'], sweep['inertie'])
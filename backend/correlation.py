@@ -0,0 +1,149 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from backend.cache import get_shared_cache
+from backend.perf import timed
+
+# Gestion de l'import optionnel de SciPy (réordonnancement hiérarchique)
+try:
+    from scipy.cluster.hierarchy import leaves_list, linkage
+    from scipy.spatial.distance import squareform
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+BLOCK_COLUMNS = 128
+# Seuil des corrélations signalées dans les insights
+STRONG_CORRELATION = 0.9
+MAX_HEATMAP_COLUMNS = 50
+METHODS = ['pearson', 'spearman']
+
+
+def _prepare(frame, method):
+    """Matrice float32 centrée-réduite (NaN conservés) ; rangs par colonne pour Spearman"""
+    if method == 'spearman':
+        frame = frame.rank()
+    X = np.empty(frame.shape, dtype='float32')
+    for j in range(frame.shape[1]):
+        # Centrage et réduction en float64, colonne par colonne : pas de perte de précision
+        # sur les grands décalages ni de dépassement float32 dans les sommes de carrés
+        values = frame.iloc[:, j].to_numpy(dtype='float64', na_value=np.nan)
+        present = values[~np.isnan(values)]
+        std = present.std() if len(present) else 0.0
+        # Colonne constante ou vide : corrélation indéfinie (NaN), comme pandas
+        X[:, j] = (values - present.mean()) / std if std > 0 else np.nan
+    return X
+
+
+def _block(X, valid, i, j):
+    """Corrélations à observations appariées entre deux blocs de colonnes (produits matriciels)"""
+    Xi, Xj = X[:, i], X[:, j]
+    Mi, Mj = valid[:, i], valid[:, j]
+    # Produits en float32, combinaison en float64 (les différences de sommes sont sensibles à l'arrondi)
+    n = (Mi.T @ Mj).astype('float64')
+    sum_i, sum_j = (Xi.T @ Mj).astype('float64'), (Mi.T @ Xj).astype('float64')
+    sq_i, sq_j = ((Xi * Xi).T @ Mj).astype('float64'), (Mi.T @ (Xj * Xj)).astype('float64')
+    cross = (Xi.T @ Xj).astype('float64')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = n * cross - sum_i * sum_j
+        corr = cov / (np.sqrt(n * sq_i - sum_i ** 2) * np.sqrt(n * sq_j - sum_j ** 2))
+    corr[n < 2] = np.nan
+    return np.clip(corr, -1, 1)
+
+
+def correlation_matrix(frame, method='pearson', block_columns=BLOCK_COLUMNS, max_workers=None):
+    """Matrice de corrélation par blocs de colonnes, éventuellement sur un pool de threads.
+
+    Équivalent de `DataFrame.corr()` (observations appariées) ; pour Spearman, les rangs
+    sont calculés une fois par colonne (identique à pandas en l'absence de valeurs manquantes).
+    """
+    columns = list(frame.columns)
+    X = _prepare(frame, method)
+    valid = ~np.isnan(X)
+    if valid.all():
+        # Pas de valeur manquante : un seul produit sur les colonnes déjà réduites
+        corr = np.clip((X.T @ X) / max(len(X), 1), -1, 1)
+        return pd.DataFrame(corr, index=columns, columns=columns)
+
+    X = np.where(valid, X, 0).astype('float32')
+    valid = valid.astype('float32')
+    p = X.shape[1]
+    blocks = [slice(start, min(start + block_columns, p)) for start in range(0, p, block_columns)]
+    tasks = [(a, b) for a in range(len(blocks)) for b in range(a, len(blocks))]
+    corr = np.empty((p, p), dtype='float32')
+
+    def run(task):
+        a, b = task
+        return task, _block(X, valid, blocks[a], blocks[b])
+
+    workers = max_workers if max_workers is not None else min(len(tasks), os.cpu_count() or 1)
+    if workers > 1:
+        # Les produits matriciels libèrent le GIL : les blocs avancent en parallèle
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run, tasks))
+    else:
+        results = [run(task) for task in tasks]
+    for (a, b), values in results:
+        corr[blocks[a], blocks[b]] = values
+        corr[blocks[b], blocks[a]] = values.T
+    return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+class CorrelationResult:
+    """Matrice de corrélation avec paires les plus fortes et ordre de lecture de la heatmap"""
+
+    def __init__(self, matrix, method):
+        self.matrix = matrix
+        self.method = method
+
+    def top_pairs(self, k=20, min_abs=0.0):
+        """Paires de colonnes distinctes triées par |corrélation| décroissante"""
+        values = self.matrix.to_numpy()
+        rows, cols = np.triu_indices(len(values), k=1)
+        strength = np.abs(values[rows, cols])
+        keep = np.flatnonzero(np.nan_to_num(strength) >= min_abs)
+        keep = keep[np.argsort(-np.nan_to_num(strength[keep]), kind='stable')][:k]
+        names = self.matrix.columns
+        return pd.DataFrame({
+            'Colonne 1': names[rows[keep]],
+            'Colonne 2': names[cols[keep]],
+            'Corrélation': values[rows[keep], cols[keep]],
+        })
+
+    def order(self, columns=None):
+        """Colonnes réordonnées pour rapprocher les variables corrélées"""
+        columns = list(self.matrix.columns if columns is None else columns)
+        if len(columns) < 3:
+            return columns
+        strength = np.nan_to_num(np.abs(self.matrix.loc[columns, columns].to_numpy(dtype='float64')))
+        np.fill_diagonal(strength, 1.0)
+        if SCIPY_AVAILABLE:
+            distance = squareform(1 - strength, checks=False)
+            leaves = leaves_list(linkage(distance, method='average'))
+        else:
+            # Sans SciPy : tri selon le vecteur propre principal
+            leaves = np.argsort(np.linalg.eigh(strength)[1][:, -1])
+        return [columns[i] for i in leaves]
+
+    def heatmap(self, max_columns=MAX_HEATMAP_COLUMNS):
+        """Sous-matrice réordonnée des colonnes les plus corrélées à au moins une autre"""
+        columns = self.matrix.columns
+        if len(columns) > max_columns:
+            strength = np.abs(self.matrix.to_numpy(dtype='float64'))
+            np.fill_diagonal(strength, np.nan)
+            best = np.nan_to_num(np.nanmax(strength, axis=1, initial=0.0))
+            columns = columns[np.sort(np.argsort(-best, kind='stable')[:max_columns])]
+        ordered = self.order(columns)
+        return self.matrix.loc[ordered, ordered]
+
+
+@timed()
+def get_correlation(view, fingerprint, columns, method='pearson'):
+    """Corrélations mises en cache par (jeu de données, état des filtres, colonnes, méthode)"""
+    return get_shared_cache().get_or_compute(
+        ('correlation', fingerprint, view.key, tuple(columns), method),
+        lambda: CorrelationResult(correlation_matrix(view.frame(columns), method), method),
+    )
@@ -0,0 +1,115 @@
+import pandas as pd
+
+from backend.cache import get_shared_cache
+from backend.perf import timed
+
+# Agrégations proposées ; la moyenne est dérivée de la somme et du compte
+STATISTICS = ['mean', 'sum', 'count', 'min', 'max']
+# Compte de lignes par cellule, disponible même sans colonne de valeurs
+ROWS = 'Lignes'
+MAX_ITEMS = 50
+TOTAL = 'Total'
+
+_ADDITIVE = ('count', 'sum')
+
+
+class Cube:
+    """Agrégats (compte, somme, min, max) calculés une fois par combinaison de dimensions.
+
+    Les tableaux croisés, sous-totaux et détails sont ensuite recalculés à partir de
+    ces agrégats, sans revenir aux lignes d'origine.
+    """
+
+    def __init__(self, frame, dimensions, measures=()):
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+        grouped = frame.groupby(self.dimensions, observed=True, sort=False)
+        parts = [grouped.size().rename((ROWS, 'count')).to_frame()]
+        if self.measures:
+            parts.append(grouped[self.measures].agg(['count', 'sum', 'min', 'max']))
+        self.base = pd.concat(parts, axis=1)
+
+    def _select(self, filters):
+        base = self.base
+        for dim, value in (filters or {}).items():
+            base = base[base.index.get_level_values(dim) == value]
+        return base
+
+    def rollup(self, dimensions, filters=None):
+        """Agrégats ré-agrégés sur un sous-ensemble des dimensions"""
+        base = self._select(filters)
+        additive = [c for c in base.columns if c[1] in _ADDITIVE]
+        mins = [c for c in base.columns if c[1] == 'min']
+        maxs = [c for c in base.columns if c[1] == 'max']
+        if not dimensions:
+            row = pd.concat([base[additive].sum(), base[mins].min(), base[maxs].max()])
+            return row.to_frame(TOTAL).T
+        grouped = base.groupby(level=list(dimensions), observed=True, sort=True)
+        return pd.concat([grouped[additive].sum(), grouped[mins].min(), grouped[maxs].max()], axis=1)
+
+    def statistics(self, aggregated, measures, statistics):
+        """Statistiques demandées (colonnes (valeur, agrégation)) à partir des agrégats"""
+        columns = {}
+        for measure in measures or [ROWS]:
+            for stat in statistics if measures else ['count']:
+                if stat == 'mean':
+                    columns[(measure, stat)] = aggregated[(measure, 'sum')] / aggregated[(measure, 'count')]
+                else:
+                    columns[(measure, stat)] = aggregated[(measure, stat)]
+        return pd.DataFrame(columns, index=aggregated.index)
+
+    def _top(self, dimension, filters, limit):
+        # Modalités les plus représentées (en nombre de lignes)
+        counts = self.rollup([dimension], filters)[(ROWS, 'count')]
+        return counts.nlargest(limit).index, max(len(counts) - limit, 0)
+
+    def pivot(self, rows, columns=None, measures=(), statistics=('mean',), filters=None,
+              margins=False, max_items=MAX_ITEMS):
+        """Tableau croisé borné à `max_items` modalités par axe.
+
+        Retourne (tableau, nombre de modalités de lignes omises, nombre de modalités de colonnes omises).
+        """
+        measures, statistics = list(measures), list(statistics)
+        keep_rows, hidden_rows = self._top(rows, filters, max_items)
+        dims = [rows] + ([columns] if columns else [])
+        aggregated = self.rollup(dims, filters)
+        aggregated = aggregated[aggregated.index.get_level_values(rows).isin(keep_rows)]
+        hidden_cols = 0
+        if columns:
+            keep_cols, hidden_cols = self._top(columns, filters, max_items)
+            aggregated = aggregated[aggregated.index.get_level_values(columns).isin(keep_cols)]
+        table = self.statistics(aggregated, measures, statistics)
+        if columns:
+            table = table.unstack(columns)
+
+        if margins:
+            # Sous-totaux lus dans les agrégats de niveau supérieur
+            grand = self.statistics(self.rollup([], filters), measures, statistics)
+            table.index = table.index.astype(object)
+            if columns:
+                row_totals = self.statistics(self.rollup([rows], filters), measures, statistics)
+                col_totals = self.statistics(self.rollup([columns], filters), measures, statistics)
+                table.columns = pd.MultiIndex.from_tuples([tuple(c) for c in table.columns])
+                bottom = col_totals.unstack()
+                ordered = []
+                for key in grand.columns:
+                    table[key + (TOTAL,)] = row_totals[key].reindex(table.index).to_numpy()
+                    bottom[key + (TOTAL,)] = grand[key].iloc[0]
+                    ordered += [c for c in table.columns if c[:2] == key]
+                table = table[ordered]
+                table.loc[TOTAL] = bottom.reindex(ordered).to_numpy()
+            else:
+                table = pd.concat([table, grand])
+        return table, hidden_rows, hidden_cols
+
+
+@timed()
+def get_cube(view, fingerprint, dimensions, measures=()):
+    """Cube mis en cache par (jeu de données, état des filtres, dimensions, valeurs) ; None ignoré"""
+    # Ordre canonique : un re-pivot (lignes et colonnes échangées) réutilise le même cube
+    dimensions = sorted({d for d in dimensions if d is not None}, key=str)
+    measures = sorted(set(measures), key=str)
+    return get_shared_cache().get_or_compute(
+        ('cube', fingerprint, view.key, tuple(dimensions), tuple(measures)),
+        lambda: Cube(view.frame(dimensions + measures), dimensions, measures),
+    )
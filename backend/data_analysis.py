@@ -1,6 +1,15 @@
-import streamlit as st
+import numpy as np
+import pandas as pd
+
+from backend.cache import get_shared_cache
+from backend.perf import timed
+from backend.sketches import DatasetSketch
+
 # Fonction d'analyse
 def analyse_data(df):
+    # Import différé : le module d'analyse reste utilisable sans Streamlit (CLI)
+    import streamlit as st
+
     st.subheader("Aperçu des données")
     st.dataframe(df.head())
 
@@ -14,4 +23,234 @@ def analyse_data(df):
     st.write(df.isnull().sum())
 
     st.subheader("Statistiques descriptives")
-    st.write(df.describe())
\ No newline at end of file
+    st.write(df.describe())
+
+
+def _column_hashes(series):
+    """Empreintes d'une colonne sous une forme canonique, indépendante du type de stockage.
+
+    Numériques en float64 (décimales arrondies à la précision float32, comme après réduction
+    des types), catégories et chaînes Arrow ramenées à leurs valeurs.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = pd.Series(np.asarray(series.array))
+    if pd.api.types.is_numeric_dtype(series):
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        if pd.api.types.is_float_dtype(series):
+            values = np.where(values != np.round(values), values.astype('float32'), values)
+        return pd.util.hash_array(values)
+    if pd.api.types.is_string_dtype(series):
+        series = series.astype(object)
+    return pd.util.hash_pandas_object(series, index=False).to_numpy()
+
+
+class RowHashIndex:
+    """Empreinte 64 bits de chaque ligne, calculée une fois et réutilisée pour les doublons"""
+
+    def __init__(self, hashes, subset=None):
+        self.hashes = np.asarray(hashes, dtype=np.uint64)
+        self.subset = list(subset) if subset else None
+        # Table de hachage sur un tableau uint64 compact : O(n)
+        self.duplicated = pd.Series(self.hashes).duplicated(keep='first').to_numpy()
+
+    @classmethod
+    def from_frame(cls, df, subset=None):
+        frame = df[list(subset)] if subset else df
+        # Empreintes par colonne canoniques, puis combinées ligne à ligne : un même fichier garde
+        # les mêmes empreintes en lecture par blocs, avec détection des types ou encodage
+        columns = pd.DataFrame({i: _column_hashes(frame.iloc[:, i]) for i in range(frame.shape[1])})
+        return cls(pd.util.hash_pandas_object(columns, index=False).to_numpy(), subset)
+
+    @property
+    def duplicate_count(self):
+        return int(self.duplicated.sum())
+
+    def take(self, positions):
+        """Index des lignes retenues (positions entières ou masque booléen)"""
+        return RowHashIndex(self.hashes[positions], self.subset)
+
+    def duplicates_among(self, positions):
+        """Nombre de doublons à l'intérieur d'un sous-ensemble de lignes (ex. vue filtrée)"""
+        return int(pd.Series(self.hashes[positions]).duplicated().sum())
+
+    def new_rows(self, previous_hashes):
+        """Masque des lignes absentes d'un jeu de données précédent"""
+        return ~pd.Series(self.hashes).isin(previous_hashes).to_numpy()
+
+    def hash_set(self):
+        return pd.unique(self.hashes)
+
+
+def get_row_index(df, fingerprint, subset=None):
+    """Index d'empreintes de lignes mis en cache par empreinte du jeu de données"""
+    subset = tuple(subset) if subset else None
+    return get_shared_cache().get_or_compute(
+        ('rowhash', fingerprint, subset), lambda: RowHashIndex.from_frame(df, subset)
+    )
+
+
+def cache_row_index(fingerprint, row_index):
+    """Enregistre un index dérivé (ex. après dédoublonnage) sans recalcul des empreintes"""
+    return get_shared_cache().put(('rowhash', fingerprint, row_index.subset and tuple(row_index.subset)), row_index)
+
+
+class DatasetProfile:
+    """Profil d'un jeu de données calculé en une passe et partagé par toutes les sections"""
+
+    def __init__(self, df, row_index=None):
+        self.n_rows, self.n_cols = df.shape
+        self.columns = df.columns.tolist()
+        self.dtypes = df.dtypes
+        self.dtype_counts = df.dtypes.astype(str).value_counts()
+
+        # Groupes de types
+        self.numeric_columns = df.select_dtypes(include='number').columns.tolist()
+        self.categorical_columns = df.select_dtypes(include=['object', 'string', 'category']).columns.tolist()
+        self.datetime_columns = df.select_dtypes(include='datetime').columns.tolist()
+
+        # Qualité
+        self.null_counts = df.isnull().sum()
+        self.total_missing = int(self.null_counts.sum())
+        if row_index is None:
+            row_index = RowHashIndex.from_frame(df)
+        self.duplicate_count = row_index.duplicate_count
+        self.cardinality = df.nunique()
+
+        # Statistiques numériques : un seul appel par famille de statistiques
+        numeric = df[self.numeric_columns]
+        self.numeric_stats = numeric.agg(['min', 'max', 'mean', 'std'])
+        self.quantiles = numeric.quantile([0.25, 0.5, 0.75])
+        self.datetime_range = {col: (df[col].min(), df[col].max()) for col in self.datetime_columns}
+
+        # Modalité la plus fréquente des colonnes catégorielles
+        self.top_values = {}
+        for col in self.categorical_columns:
+            counts = df[col].value_counts()
+            if len(counts):
+                self.top_values[col] = (counts.index[0], int(counts.iloc[0]))
+
+    @property
+    def total_cells(self):
+        return self.n_rows * self.n_cols
+
+    @property
+    def missing_percentage(self):
+        return (self.total_missing / self.total_cells * 100) if self.total_cells else 0.0
+
+    @property
+    def missing_table(self):
+        return pd.DataFrame({
+            'Colonne': self.columns,
+            'Valeurs manquantes': self.null_counts.values,
+            'Pourcentage': (self.null_counts / max(self.n_rows, 1) * 100).round(2).values,
+        })
+
+    def describe(self):
+        """Équivalent de `describe(include='all')` reconstruit à partir du profil"""
+        index = ['count', 'unique', 'top', 'freq', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+        table = pd.DataFrame(index=index, columns=self.columns, dtype=object)
+        counts = self.n_rows - self.null_counts
+        for col in self.columns:
+            table.loc['count', col] = counts[col]
+        for col in self.numeric_columns:
+            for stat in ['mean', 'std', 'min', 'max']:
+                # Flottants Python : une colonne float32 ne mêle pas deux types NumPy (affichage Arrow)
+                table.loc[stat, col] = float(self.numeric_stats.loc[stat, col])
+            for q, label in zip([0.25, 0.5, 0.75], ['25%', '50%', '75%']):
+                table.loc[label, col] = float(self.quantiles.loc[q, col])
+        for col in self.categorical_columns:
+            table.loc['unique', col] = self.cardinality[col]
+            if col in self.top_values:
+                table.loc['top', col], table.loc['freq', col] = self.top_values[col]
+        for col in self.datetime_columns:
+            table.loc['min', col], table.loc['max', col] = self.datetime_range[col]
+        return table.dropna(how='all')
+
+
+def get_profile(df, fingerprint):
+    """Profil mis en cache par empreinte du jeu de données"""
+    return get_shared_cache().get_or_compute(
+        ('profile', fingerprint), lambda: DatasetProfile(df, get_row_index(df, fingerprint))
+    )
+
+
+class OutlierMask:
+    """Masque des valeurs aberrantes (méthode IQR) pour plusieurs colonnes, compacté bit à bit"""
+
+    def __init__(self, df, columns, factor=1.5, quartiles=None):
+        self.columns = list(columns)
+        self.n_rows = len(df)
+        values = df[self.columns]
+
+        # Quartiles et médiane de toutes les colonnes en un seul appel (ou fournis par une esquisse)
+        if quartiles is None:
+            quartiles = values.quantile([0.25, 0.5, 0.75])
+        q1, median, q3 = quartiles[self.columns].to_numpy()
+        iqr = q3 - q1
+        self.lower = pd.Series(q1 - factor * iqr, index=self.columns)
+        self.upper = pd.Series(q3 + factor * iqr, index=self.columns)
+        self.medians = pd.Series(median, index=self.columns)
+
+        mask = (values.lt(self.lower, axis=1) | values.gt(self.upper, axis=1)).to_numpy()
+        self.counts = pd.Series(mask.sum(axis=0), index=self.columns)
+        # 1 bit par cellule au lieu d'un octet
+        self._packed = np.packbits(mask, axis=0)
+
+    def matrix(self):
+        return np.unpackbits(self._packed, axis=0, count=self.n_rows).astype(bool)
+
+    def column(self, col):
+        j = self.columns.index(col)
+        return np.unpackbits(self._packed[:, j], count=self.n_rows).astype(bool)
+
+    def rows(self):
+        """Lignes contenant au moins une valeur aberrante"""
+        return self.matrix().any(axis=1)
+
+    def apply(self, df, action):
+        """Traitement vectorisé : 'Marquer', 'Supprimer' ou 'Remplacer par médiane'"""
+        if action == "Marquer":
+            return df.assign(Anomalie=self.rows())
+        if action == "Supprimer":
+            return df[~self.rows()]
+        if action == "Remplacer par médiane":
+            mask = pd.DataFrame(self.matrix(), index=df.index, columns=self.columns)
+            treated = df.copy()
+            treated[self.columns] = df[self.columns].mask(mask, self.medians, axis=1)
+            return treated
+        return df
+
+
+def get_outlier_mask(df, fingerprint, columns, sketch=None):
+    """Masque des valeurs aberrantes mis en cache par empreinte et colonnes.
+
+    Avec une esquisse, les quartiles approchés remplacent le calcul exact
+    (calcul exact si l'esquisse ne couvre pas toutes les colonnes).
+    """
+    if sketch is not None and not all(col in sketch.quantiles for col in columns):
+        sketch = None
+    quartiles = sketch.quartiles(columns) if sketch is not None else None
+    return get_shared_cache().get_or_compute(
+        ('outliers', fingerprint, tuple(columns), sketch is not None),
+        lambda: OutlierMask(df, columns, quartiles=quartiles),
+    )
+
+
+def get_sketch(df, fingerprint):
+    """Esquisses statistiques (mode approximatif) mises en cache par empreinte"""
+    return get_shared_cache().get_or_compute(('sketch', fingerprint), lambda: DatasetSketch.from_frame(df))
+
+
+@timed()
+def detect_anomalies(df, numerical_columns, outlier_mask=None):
+    """Détection des valeurs aberrantes (comptes uniquement, sans matérialiser les valeurs)"""
+    if outlier_mask is None:
+        outlier_mask = OutlierMask(df, numerical_columns)
+    anomalies = {}
+    for col in numerical_columns:
+        count = int(outlier_mask.counts[col])
+        anomalies[col] = {
+            'count': count,
+            'percentage': (count / len(df)) * 100 if len(df) else 0.0,
+        }
+    return anomalies
@@ -1,16 +1,463 @@
-import streamlit as st
+import hashlib
+import io
+import json
+import os
+import threading
+
+import numpy as np
 import pandas as pd
+
+from backend.cache import derive_key, get_shared_cache, touch, trim_directory
+from backend.sketches import DatasetSketch
+from backend.type_inference import apply_types
+
+# Gestion de l'import optionnel de PyArrow (cache disque Parquet)
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Cache disque optionnel (ex. ~/.cache/hevitravizor) : désactivé tant que le répertoire n'est pas fixé
+CACHE_DIR = os.environ.get("HEVITRA_CACHE_DIR", "")
+# Taille totale du cache disque (en Mo) ; les fichiers les moins récemment lus sont supprimés au-delà
+CACHE_DIR_MB = int(os.environ.get("HEVITRA_CACHE_DIR_MB", "2048"))
+# Chargement paresseux : à partir de ce nombre de colonnes, seules les colonnes choisies sont lues
+LAZY_MIN_COLUMNS = int(os.environ.get("HEVITRA_LAZY_COLUMNS", "100"))
+# Lignes lues pour exposer le schéma avant tout chargement complet ; colonnes sélectionnées d'office
+SCHEMA_SAMPLE_ROWS = 1_000
+LAZY_DEFAULT_COLUMNS = 20
+
+
+def content_digest(content):
+    """Empreinte des octets du fichier"""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def file_fingerprint(digest, options=None):
+    """Empreinte combinant le contenu du fichier et les options de lecture"""
+    payload = json.dumps(options or {}, sort_keys=True, default=str)
+    return hashlib.blake2b((digest + payload).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def read_frame(content, file_name, **options):
+    """Lecture d'un fichier CSV ou Excel à partir de ses octets"""
+    buffer = io.BytesIO(content)
+    if file_name.endswith('.csv'):
+        return pd.read_csv(buffer, **options)
+    return pd.read_excel(buffer, **options)
+
+
+def _encode_text(series, category_ratio):
+    # Colonnes texte uniquement : les colonnes object mixtes sont laissées telles quelles
+    if isinstance(series.dtype, pd.CategoricalDtype) or not pd.api.types.is_string_dtype(series):
+        return None
+    if pd.api.types.is_object_dtype(series) and pd.api.types.infer_dtype(series, skipna=True) != 'string':
+        return None
+    if len(series) and series.nunique() <= category_ratio * len(series):
+        return series.astype('category')
+    if PYARROW_AVAILABLE and getattr(series.dtype, 'storage', None) != 'pyarrow':
+        # Forte cardinalité : chaînes Arrow contiguës plutôt qu'objets Python
+        return series.astype('string[pyarrow]')
+    return None
+
+
+def downcast_frame(df, category_ratio=0.5):
+    """Types compacts : int8/16/32, float32, category ou chaînes Arrow pour les textes"""
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series):
+            df[col] = pd.to_numeric(series, downcast='float')
+        else:
+            encoded = _encode_text(series, category_ratio)
+            if encoded is not None:
+                df[col] = encoded
+    return df
+
+
+def encode_categoricals(df, category_ratio=0.5):
+    """Encodage des colonnes texte au chargement, avec rapport de mémoire par colonne"""
+    report = []
+    for col in df.columns:
+        encoded = _encode_text(df[col], category_ratio)
+        if encoded is None:
+            continue
+        before = int(df[col].memory_usage(index=False, deep=True))
+        after = int(encoded.memory_usage(index=False, deep=True))
+        df[col] = encoded
+        report.append({
+            'Colonne': str(col),
+            'Type': str(encoded.dtype),
+            'Modalités': int(len(encoded.cat.categories)) if encoded.dtype == 'category' else None,
+            'Avant (Mo)': round(before / 1024 ** 2, 2),
+            'Après (Mo)': round(after / 1024 ** 2, 2),
+        })
+    return df, report
+
+
+def _concat_chunks(chunks):
+    # Catégories unifiées avant concaténation pour éviter un retour en object
+    for col in chunks[0].columns:
+        if all(isinstance(c[col].dtype, pd.CategoricalDtype) for c in chunks):
+            categories = chunks[0][col].cat.categories
+            for chunk in chunks[1:]:
+                categories = categories.union(chunk[col].cat.categories)
+            for chunk in chunks:
+                chunk[col] = chunk[col].cat.set_categories(categories)
+    frame = pd.concat(chunks, ignore_index=True)
+    # Les types peuvent diverger d'un bloc à l'autre : dernière passe de réduction
+    return downcast_frame(frame)
+
+
+def read_csv_chunks(content, chunksize=100_000, memory_limit_mb=None,
+                    progress_callback=None, chunk_callback=None, random_state=42, **options):
+    """Lecture par blocs avec réduction des types et plafond mémoire.
+
+    Si la projection de mémoire finale dépasse le plafond, les blocs déjà lus
+    et les suivants sont échantillonnés uniformément au taux nécessaire.
+    `chunk_callback` reçoit chaque bloc complet, avant échantillonnage.
+    """
+    buffer = io.BytesIO(content)
+    total_bytes = max(len(content), 1)
+    rng = np.random.default_rng(random_state)
+    limit = memory_limit_mb * 1024 ** 2 if memory_limit_mb else None
+    chunks, used, rows_read, sample_rate = [], 0, 0, 1.0
+
+    for chunk in pd.read_csv(buffer, chunksize=chunksize, **options):
+        rows_read += len(chunk)
+        chunk = downcast_frame(chunk)
+        if chunk_callback is not None:
+            chunk_callback(chunk)
+        if sample_rate < 1.0:
+            chunk = chunk.sample(frac=sample_rate, random_state=rng)
+        chunks.append(chunk)
+        used += int(chunk.memory_usage(index=True, deep=True).sum())
+
+        fraction = min(buffer.tell() / total_bytes, 1.0)
+        if limit and fraction > 0 and used / fraction > limit:
+            # Marge de 10 % : la projection repose sur la position de lecture
+            new_rate = sample_rate * 0.9 * limit / (used / fraction)
+            factor = new_rate / sample_rate
+            chunks = [c.sample(frac=factor, random_state=rng) for c in chunks]
+            used = sum(int(c.memory_usage(index=True, deep=True).sum()) for c in chunks)
+            sample_rate = new_rate
+        if progress_callback is not None:
+            progress_callback(fraction, rows_read)
+
+    if not chunks:
+        return pd.read_csv(io.BytesIO(content), **options), {'rows_read': 0, 'sample_rate': 1.0}
+    frame = _concat_chunks(chunks)
+    return frame, {'rows_read': rows_read, 'sample_rate': sample_rate}
+
+
+def _disk_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.parquet")
+
+
+def trim_disk_cache(max_bytes=None):
+    """Supprime les entrées les moins récemment lues jusqu'à repasser sous le plafond"""
+    if CACHE_DIR:
+        trim_directory(CACHE_DIR, CACHE_DIR_MB * 1024 ** 2 if max_bytes is None else max_bytes)
+
+
+def _read_from_disk(key):
+    if not (CACHE_DIR and PYARROW_AVAILABLE):
+        return None
+    path = _disk_path(key)
+    if not os.path.exists(path):
+        return None
+    touch(path)
+    try:
+        info = {}
+        if os.path.exists(path + ".json"):
+            with open(path + ".json", encoding='utf-8') as f:
+                info = json.load(f)
+        return pd.read_parquet(path), info
+    except Exception:
+        # Fichier corrompu ou incompatible : on le régénère
+        os.remove(path)
+        return None
+
+
+def _write_to_disk(key, frame, info):
+    if not (CACHE_DIR and PYARROW_AVAILABLE):
+        return
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = _disk_path(key) + ".tmp"
+        frame.to_parquet(tmp_path)
+        with open(_disk_path(key) + ".json", 'w', encoding='utf-8') as f:
+            json.dump(info, f)
+        os.replace(tmp_path, _disk_path(key))
+        trim_disk_cache()
+    except Exception:
+        # Colonnes non sérialisables en Parquet : le cache mémoire suffit
+        pass
+
+
+def ingest(content, file_name, options=None, digest=None, streaming=None,
+           progress_callback=None, build_sketch=False, encode=False, detect_types=False):
+    """Lecture avec cache : mémoire partagée (LRU) puis disque (Parquet), sinon parsing.
+
+    `streaming` (dict : chunksize, memory_limit_mb) active la lecture CSV par blocs ;
+    avec `build_sketch`, les esquisses statistiques sont construites au fil des blocs ;
+    `encode` convertit les colonnes texte en category / chaînes Arrow ;
+    `detect_types` convertit dates, nombres et booléens stockés en texte (types détectés sur échantillon).
+    Retourne (empreinte, DataFrame, infos de chargement).
+    """
+    options = dict(options or {})
+    digest = digest or content_digest(content)
+    key = file_fingerprint(digest, dict(options, extension=os.path.splitext(file_name)[1],
+                                        streaming=streaming, encode=encode, detect_types=detect_types))
+    cache = get_shared_cache()
+    cached = cache.get(('frame', key))
+    if cached is None:
+        cached = _read_from_disk(key)
+        if cached is None:
+            sketch = None
+            if streaming is not None and file_name.endswith('.csv'):
+                sketch = DatasetSketch() if build_sketch else None
+                cached = read_csv_chunks(content, progress_callback=progress_callback,
+                                         chunk_callback=sketch.update if sketch else None,
+                                         **streaming, **options)
+            elif streaming is not None:
+                # Pas de lecture par blocs pour Excel : réduction des types après coup
+                cached = downcast_frame(read_frame(content, file_name, **options)), {}
+            else:
+                cached = read_frame(content, file_name, **options), {}
+            if detect_types:
+                frame, report = apply_types(cached[0])
+                cached = frame, dict(cached[1], types=report)
+                if report:
+                    # Esquisses construites sur le texte brut : reconstruites depuis les colonnes converties
+                    sketch = None
+            if sketch is not None:
+                cache.put(('sketch', key), sketch)
+            if encode:
+                before = int(cached[0].memory_usage(index=True, deep=True).sum())
+                frame, report = encode_categoricals(cached[0])
+                cached = frame, dict(cached[1], encoding=report, memory_before=before,
+                                     memory_after=int(frame.memory_usage(index=True, deep=True).sum()))
+            _write_to_disk(key, *cached)
+        cache.put(('frame', key), cached)
+    frame, info = cached
+    # Copie superficielle : l'ajout de colonnes ne modifie pas l'objet en cache
+    return key, frame.copy(deep=False), info
+
+
+class LazyFrame:
+    """Fichier CSV lu colonne par colonne, à la demande.
+
+    Le schéma (colonnes, types lus) est établi sur un échantillon de tête dès l'ouverture ;
+    les colonnes demandées sont ensuite lues avec `usecols`, converties comme dans
+    `ingest`, copiées sur disque en Parquet (une colonne par fichier) et conservées
+    dans le cache partagé : les colonnes récentes restent en mémoire, les autres
+    sont relues depuis la copie en colonnes plutôt que depuis le CSV.
+    """
+
+    def __init__(self, content, file_name, options=None, digest=None, encode=False, detect_types=False):
+        self.content = content
+        self.options = dict(options or {})
+        self.encode = encode
+        self.detect_types = detect_types
+        digest = digest or content_digest(content)
+        self.key = file_fingerprint(digest, dict(self.options, extension=os.path.splitext(file_name)[1],
+                                                 lazy=True, encode=encode, detect_types=detect_types))
+        # Détection des types à la lecture des colonnes seulement : le schéma doit rester immédiat
+        self.sample = pd.read_csv(io.BytesIO(content), nrows=SCHEMA_SAMPLE_ROWS, **self.options)
+        self.columns = self.sample.columns.tolist()
+        self.n_rows = None
+        self._lock = threading.Lock()
+
+    @property
+    def dtypes(self):
+        """Types lus sur l'échantillon, avant détection et encodage des colonnes texte"""
+        return self.sample.dtypes
+
+    def schema(self):
+        return pd.DataFrame({
+            'Colonne': self.columns,
+            'Type (échantillon)': [str(t) for t in self.sample.dtypes],
+            'Manquantes (échantillon)': self.sample.isnull().sum().values,
+        })
+
+    def estimated_rows(self):
+        """Nombre de lignes exact si une colonne a été lue, sinon estimé d'après l'échantillon"""
+        if self.n_rows is not None:
+            return self.n_rows
+        head = self.content[:1024 ** 2]
+        lines = head.count(b'\n') or 1
+        return max(int(len(self.content) * lines / max(len(head), 1)) - 1, len(self.sample))
+
+    def _ordered(self, columns=None):
+        """Colonnes demandées, dans l'ordre du fichier (ordre de sélection ignoré)"""
+        return [col for col in self.columns if columns is None or col in columns]
+
+    def frame_key(self, columns):
+        """Empreinte du jeu de données réduit aux colonnes demandées, quel que soit leur ordre"""
+        return derive_key(self.key, 'columns', *self._ordered(columns))
+
+    def _convert(self, frame):
+        if self.detect_types:
+            frame, _ = apply_types(frame)
+        if self.encode:
+            frame, _ = encode_categoricals(frame)
+        return frame
+
+    def _column_path(self, col):
+        return os.path.join(CACHE_DIR, f"{self.key}.columns", f"{self.columns.index(col)}.parquet")
+
+    def _read_column(self, col):
+        # Copie en colonnes sur disque (relecture après éviction ou dans un autre processus)
+        if not (CACHE_DIR and PYARROW_AVAILABLE) or not os.path.exists(self._column_path(col)):
+            return None
+        touch(self._column_path(col))
+        try:
+            return pd.read_parquet(self._column_path(col))[str(col)].rename(col)
+        except Exception:
+            os.remove(self._column_path(col))
+            return None
+
+    def _write_column(self, col, series):
+        if not (CACHE_DIR and PYARROW_AVAILABLE):
+            return
+        try:
+            path = self._column_path(col)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            series.rename(str(col)).to_frame().to_parquet(path + ".tmp")
+            os.replace(path + ".tmp", path)
+        except Exception:
+            pass
+
+    def load(self, columns):
+        """Colonnes demandées (dict colonne -> Series), lues en une passe pour celles absentes du cache"""
+        cache = get_shared_cache()
+        loaded = {col: cache.get(('column', self.key, col)) for col in columns}
+        missing = [col for col, series in loaded.items() if series is None]
+        if not missing:
+            return loaded
+        with self._lock:
+            # Une autre session a pu lire ces colonnes pendant l'attente du verrou
+            for col in missing:
+                loaded[col] = cache.get(('column', self.key, col))
+                if loaded[col] is None:
+                    loaded[col] = self._read_column(col)
+            unread = [col for col in missing if loaded[col] is None]
+            if unread:
+                frame = self._convert(pd.read_csv(io.BytesIO(self.content), usecols=unread, **self.options))
+                for col in unread:
+                    loaded[col] = frame[col]
+                    self._write_column(col, frame[col])
+                if CACHE_DIR:
+                    trim_disk_cache()
+            for col in missing:
+                cache.put(('column', self.key, col), loaded[col])
+                self.n_rows = len(loaded[col])
+        return loaded
+
+    def frame(self, columns=None):
+        """DataFrame des colonnes demandées, dans l'ordre du fichier"""
+        columns = self._ordered(columns)
+        if not columns:
+            return self.sample.iloc[:0]
+        loaded = self.load(columns)
+        return pd.DataFrame({col: loaded[col] for col in columns})
+
+
+def open_lazy(content, file_name, options=None, digest=None, encode=False, detect_types=False):
+    """Fichier paresseux partagé par empreinte : schéma lu une fois pour toutes les sessions"""
+    digest = digest or content_digest(content)
+    return get_shared_cache().get_or_compute(
+        ('lazy', digest, json.dumps(options or {}, sort_keys=True, default=str), encode, detect_types),
+        lambda: LazyFrame(content, file_name, options, digest, encode=encode, detect_types=detect_types),
+    )
+
+
+def _uploaded_digest(uploaded_file):
+    # L'identifiant d'upload évite de re-hacher les octets à chaque rerun
+    file_id = getattr(uploaded_file, 'file_id', None)
+    if file_id is None:
+        return content_digest(uploaded_file.getvalue())
+    cache = get_shared_cache()
+    return cache.get_or_compute(
+        ('digest', file_id, uploaded_file.size),
+        lambda: content_digest(uploaded_file.getvalue()),
+    )
+
+
 # Fonction pour charger les données
-@st.cache_data
-def load_data(uploaded_file):
+def load_data(uploaded_file, streaming=None, build_sketch=False, encode=False, detect_types=False, **options):
+    """Retourne (empreinte, DataFrame) ; (None, None) en cas d'erreur"""
+    # Import différé : les fonctions de lecture restent utilisables sans Streamlit (CLI)
+    import streamlit as st
+
+    if not uploaded_file.name.endswith(('.csv', '.xlsx', '.xls')):
+        st.warning("Type de fichier non supporté. Veuillez uploader un fichier .csv ou .xlsx")
+        return None, None
     try:
-        if uploaded_file.name.endswith('.csv'):
-            return pd.read_csv(uploaded_file)
-        elif uploaded_file.name.endswith('.xlsx'):
-            return pd.read_excel(uploaded_file)
-        else:
-            st.warning("Type de fichier non supporté. Veuillez uploader un fichier .csv ou .xlsx")
+        progress_bar = None
+        if streaming is not None:
+            progress_bar = st.sidebar.progress(0.0, text="Chargement par blocs...")
+
+        def report_progress(fraction, rows_read):
+            progress_bar.progress(fraction, text=f"Chargement : {rows_read:,} lignes lues")
+
+        key, frame, info = ingest(uploaded_file.getvalue(), uploaded_file.name, options,
+                                  digest=_uploaded_digest(uploaded_file), streaming=streaming,
+                                  progress_callback=report_progress if progress_bar else None,
+                                  build_sketch=build_sketch, encode=encode, detect_types=detect_types)
+        if progress_bar is not None:
+            progress_bar.empty()
+        if info.get('sample_rate', 1.0) < 1.0:
+            st.sidebar.warning(
+                f"⚠️ Plafond mémoire atteint : échantillon de {info['sample_rate']:.1%} "
+                f"des {info['rows_read']:,} lignes chargé"
+            )
+        if info.get('types'):
+            with st.sidebar.expander(f"🔎 Types détectés : {len(info['types'])} colonnes converties"):
+                st.dataframe(pd.DataFrame(info['types']), use_container_width=True)
+        if info.get('encoding'):
+            saved = (info['memory_before'] - info['memory_after']) / 1024 ** 2
+            with st.sidebar.expander(f"🗜️ Encodage des textes : {saved:.1f} Mo économisés"):
+                st.dataframe(pd.DataFrame(info['encoding']), use_container_width=True)
+        return key, frame
+    except Exception as e:
+        st.error(f"Erreur lors du chargement : {e}")
+        return None, None
+
+
+def load_lazy(uploaded_file, encode=False, detect_types=False, **options):
+    """Chargement des seules colonnes choisies pour un CSV large.
+
+    Retourne (empreinte, DataFrame), (None, None) en cas d'erreur, ou None si le fichier
+    compte moins de `LAZY_MIN_COLUMNS` colonnes (chargement complet habituel).
+    """
+    import streamlit as st
+
+    if not uploaded_file.name.endswith('.csv'):
+        return None
+    try:
+        digest = _uploaded_digest(uploaded_file)
+        # Les options de lecture (séparateur, encodage…) changent l'en-tête : elles entrent dans la clé
+        header = get_shared_cache().get_or_compute(
+            ('header', digest, json.dumps(options, sort_keys=True, default=str)), lambda: pd.read_csv(io.BytesIO(uploaded_file.getvalue()), nrows=0, **options)
+        )
+        if len(header.columns) < LAZY_MIN_COLUMNS:
             return None
+        lazy = open_lazy(uploaded_file.getvalue(), uploaded_file.name, options, digest,
+                         encode=encode, detect_types=detect_types)
+        with st.sidebar.expander(f"📋 Schéma : {len(lazy.columns)} colonnes, ~{lazy.estimated_rows():,} lignes"):
+            st.dataframe(lazy.schema(), use_container_width=True)
+        default = lazy.columns[:LAZY_DEFAULT_COLUMNS]
+        columns = st.sidebar.multiselect(
+            "Colonnes analysées :", lazy.columns, default=default, key=f"lazy_columns_{lazy.key}",
+            help="Fichier large : seules les colonnes sélectionnées sont lues, puis conservées en cache"
+        ) or default
+        return lazy.frame_key(columns), lazy.frame(columns)
     except Exception as e:
         st.error(f"Erreur lors du chargement : {e}")
-        return None
\ No newline at end of file
+        return None, None
@@ -0,0 +1,272 @@
+import gzip
+import itertools
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from backend.cache import derive_key, touch, trim_directory
+from backend.perf import timed
+
+# Gestion des imports optionnels (Parquet / Feather, CSV zstd)
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Répertoire des fichiers d'export, réutilisés tant que (données, filtres, format) ne changent pas
+EXPORT_DIR = os.environ.get(
+    "HEVITRA_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "hevitravizor-exports")
+)
+# Taille totale des exports conservés (en Mo) : les moins récemment téléchargés sont supprimés au-delà
+EXPORT_DIR_MB = int(os.environ.get("HEVITRA_EXPORT_MB", "2048"))
+CHUNK_ROWS = 100_000
+
+# Format -> (libellé, extension, type MIME)
+FORMATS = {
+    'csv': ("CSV", ".csv", "text/csv"),
+    'csv.gz': ("CSV gzip", ".csv.gz", "application/gzip"),
+    'csv.zst': ("CSV zstd", ".csv.zst", "application/zstd"),
+    'parquet': ("Parquet", ".parquet", "application/vnd.apache.parquet"),
+    'feather': ("Feather", ".feather", "application/vnd.apache.arrow.file"),
+    'xlsx': ("Excel", ".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def available_formats():
+    """Formats utilisables avec les dépendances installées"""
+    formats = ['csv', 'csv.gz']
+    if ZSTD_AVAILABLE:
+        formats.append('csv.zst')
+    if PYARROW_AVAILABLE:
+        formats += ['parquet', 'feather']
+    return formats
+
+
+def export_path(fingerprint, view_key, fmt, *extra):
+    """Chemin du fichier d'export pour (jeu de données, état des filtres, format)"""
+    name = derive_key(fingerprint, view_key, fmt, *extra)
+    return os.path.join(EXPORT_DIR, name + FORMATS[fmt][1])
+
+
+def find_export(fingerprint, view_key, fmt, *extra):
+    """Fichier déjà généré, sinon None"""
+    path = export_path(fingerprint, view_key, fmt, *extra)
+    if not os.path.exists(path):
+        return None
+    touch(path)
+    return path
+
+
+def read_export(path):
+    """Contenu d'un export, lu seulement au clic sur le bouton de téléchargement"""
+    with open(path, 'rb') as handle:
+        return handle.read()
+
+
+def iter_chunks(view, chunk_rows=CHUNK_ROWS):
+    """Blocs de lignes de la vue, matérialisés un par un"""
+    for start in range(0, max(view.n_rows, 1), chunk_rows):
+        if view.rows is None:
+            yield view.df.iloc[start:start + chunk_rows]
+        else:
+            yield view.df.iloc[view.rows[start:start + chunk_rows]]
+
+
+def _open_text(path, fmt):
+    if fmt == 'csv.gz':
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    if fmt == 'csv.zst':
+        return zstandard.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def arrow_schema(view, sample_rows=1_000):
+    """Schéma Arrow fixé d'après le jeu de données complet, et non d'après le premier bloc.
+
+    Les colonnes object (sans type Arrow déductible d'un cadre vide) prennent le type
+    de leurs premières valeurs non manquantes ; entièrement vides, elles restent nulles.
+    """
+    frame = view.df
+    schema = pa.Schema.from_pandas(frame.iloc[:0], preserve_index=False)
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            values = frame.iloc[:, i].dropna()
+            if len(values):
+                schema = schema.set(i, field.with_type(pa.array(values.iloc[:sample_rows]).type))
+    return schema
+
+
+def write_export(view, fmt, path, chunk_rows=CHUNK_ROWS, progress_callback=None):
+    """Écriture par blocs : la vue n'est jamais matérialisée ni sérialisée en mémoire d'un seul tenant"""
+    total = max(view.n_rows, 1)
+    written = 0
+    if fmt.startswith('csv'):
+        with _open_text(path, fmt) as handle:
+            for i, chunk in enumerate(iter_chunks(view, chunk_rows)):
+                chunk.to_csv(handle, index=False, header=i == 0)
+                written += len(chunk)
+                if progress_callback is not None:
+                    progress_callback(written / total)
+        return path
+
+    schema = arrow_schema(view)
+    writer = pq.ParquetWriter(path, schema) if fmt == 'parquet' else pa.ipc.new_file(path, schema)
+    try:
+        for chunk in iter_chunks(view, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            written += len(chunk)
+            if progress_callback is not None:
+                progress_callback(written / total)
+    finally:
+        writer.close()
+    return path
+
+
+@timed()
+def get_export(view, fingerprint, fmt, progress_callback=None):
+    """Export mis en cache sur disque ; un second téléchargement ne regénère rien"""
+    path = find_export(fingerprint, view.key, fmt)
+    if path is not None:
+        return path
+    path = export_path(fingerprint, view.key, fmt)
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    # Écriture dans un fichier temporaire puis renommage : jamais de fichier partiel servi
+    fd, partial = tempfile.mkstemp(dir=EXPORT_DIR, suffix='.part')
+    os.close(fd)
+    try:
+        write_export(view, fmt, partial, progress_callback=progress_callback)
+        # Place faite avant l'ajout : le fichier produit n'est jamais supprimé aussitôt
+        trim_directory(EXPORT_DIR, EXPORT_DIR_MB * 1024 ** 2 - os.path.getsize(partial))
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return path
+
+
+# Limite de lignes d'une feuille Excel (en-tête compris)
+EXCEL_MAX_ROWS = 1_048_576
+EXCEL_CHUNK_ROWS = 20_000
+# Calibrage de l'estimation affichée avant génération (xlsxwriter en mode constant_memory)
+EXCEL_CELLS_PER_SECOND = 100_000
+EXCEL_BYTES_PER_CELL = 6
+EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+
+
+def excel_sheets(name, n_rows, max_rows=EXCEL_MAX_ROWS):
+    """Découpage en feuilles (nom, première ligne, dernière ligne exclue) au-delà de la limite Excel"""
+    data_rows = max_rows - 1
+    parts = max(1, -(-n_rows // data_rows))
+    return [(name if i == 0 else f"{name} ({i + 1})", i * data_rows, min((i + 1) * data_rows, n_rows))
+            for i in range(parts)]
+
+
+def estimate_excel(sources):
+    """Taille (octets), durée (s) et nombre de feuilles estimés ; sources : [(nom, vue, étiquettes)]"""
+    cells, sheets = 0, 0
+    for name, view, labels in sources:
+        cells += view.n_rows * (view.df.shape[1] + (labels is not None))
+        sheets += len(excel_sheets(name, view.n_rows))
+    return cells * EXCEL_BYTES_PER_CELL, cells / EXCEL_CELLS_PER_SECOND, sheets
+
+
+def _excel_rows(view, start, stop, labels):
+    # Préparation d'un bloc de lignes : valeurs Python, cellules vides pour les manquants
+    positions = slice(start, stop) if view.rows is None else view.rows[start:stop]
+    chunk = view.df.iloc[positions]
+    if labels is not None:
+        chunk = chunk.assign(Cluster=labels[positions])
+    for col in chunk.columns:
+        series = chunk[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            # Numéro de série Excel calculé en bloc (le format date est porté par la colonne)
+            if series.dt.tz is not None:
+                series = series.dt.tz_localize(None)
+            chunk = chunk.assign(**{col: (series - EXCEL_EPOCH) / pd.Timedelta(days=1)})
+    return chunk.astype(object).where(chunk.notna(), None).to_numpy().tolist()
+
+
+def write_excel(path, sources, chunk_rows=EXCEL_CHUNK_ROWS, max_workers=2, progress_callback=None):
+    """Classeur écrit ligne à ligne (mode constant_memory de xlsxwriter).
+
+    Les blocs des différentes feuilles sont préparés en parallèle et entrelacés ;
+    l'écriture reste séquentielle par feuille, comme l'exige le mode constant_memory.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    header_format = workbook.add_format({'bold': True})
+    date_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+    queues = []
+    for name, view, labels in sources:
+        header = [str(c) for c in view.df.columns] + (['Cluster'] if labels is not None else [])
+        tasks = []
+        for sheet_name, first, last in excel_sheets(name, view.n_rows):
+            worksheet = workbook.add_worksheet(sheet_name[:31])
+            worksheet.write_row(0, 0, header, header_format)
+            for i, dtype in enumerate(view.df.dtypes):
+                if pd.api.types.is_datetime64_any_dtype(dtype):
+                    worksheet.set_column(i, i, 19, date_format)
+            for start in range(first, last, chunk_rows):
+                tasks.append((worksheet, start - first + 1, view, start, min(start + chunk_rows, last), labels))
+        queues.append(tasks)
+    # Entrelacement des feuilles : chacune avance au fil des blocs préparés
+    tasks = [task for group in itertools.zip_longest(*queues) for task in group if task is not None]
+
+    done = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = deque()
+
+            def write_next():
+                nonlocal done
+                (worksheet, row, *_), future = pending.popleft()
+                for offset, values in enumerate(future.result()):
+                    worksheet.write_row(row + offset, 0, values)
+                done += 1
+                if progress_callback is not None:
+                    progress_callback(done / max(len(tasks), 1))
+
+            for task in tasks:
+                pending.append((task, pool.submit(_excel_rows, *task[2:])))
+                # Nombre de blocs en attente borné : la mémoire reste constante
+                if len(pending) > 2 * max_workers:
+                    write_next()
+            while pending:
+                write_next()
+    finally:
+        workbook.close()
+    return path
+
+
+@timed()
+def get_excel(sources, fingerprint, view_key, variant=None, progress_callback=None):
+    """Classeur mis en cache sur disque par (jeu de données, état des filtres, variante)"""
+    path = find_export(fingerprint, view_key, 'xlsx', variant)
+    if path is not None:
+        return path
+    path = export_path(fingerprint, view_key, 'xlsx', variant)
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    fd, partial = tempfile.mkstemp(dir=EXPORT_DIR, suffix='.part')
+    os.close(fd)
+    try:
+        write_excel(partial, sources, progress_callback=progress_callback)
+        # Place faite avant l'ajout : le fichier produit n'est jamais supprimé aussitôt
+        trim_directory(EXPORT_DIR, EXPORT_DIR_MB * 1024 ** 2 - os.path.getsize(partial))
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return path
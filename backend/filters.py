@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+from backend.cache import derive_key, get_shared_cache
+
+
+def is_range_column(series):
+    """Colonnes filtrées par plage (curseur) plutôt que par modalités"""
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+class FilteredView:
+    """Vue filtrée légère : positions de lignes sur un jeu de données laissé intact"""
+
+    shared_attributes = ('df',)
+
+    def __init__(self, df, rows=None, key='all'):
+        self.df = df
+        self.rows = rows
+        self.key = key
+
+    @property
+    def n_rows(self):
+        return len(self.df) if self.rows is None else len(self.rows)
+
+    @property
+    def shape(self):
+        return self.n_rows, self.df.shape[1]
+
+    @property
+    def positions(self):
+        return np.arange(len(self.df)) if self.rows is None else self.rows
+
+    def frame(self, columns=None):
+        """Matérialise uniquement les colonnes demandées"""
+        frame = self.df if columns is None else self.df[list(columns)]
+        return frame if self.rows is None else frame.iloc[self.rows]
+
+    def column(self, col):
+        return self.df[col] if self.rows is None else self.df[col].iloc[self.rows]
+
+    def value_counts(self, col):
+        """Comptes par modalité ; sur les codes entiers pour les colonnes catégorielles"""
+        series = self.df[col]
+        if not isinstance(series.dtype, pd.CategoricalDtype):
+            return self.column(col).value_counts()
+        codes = series.cat.codes.to_numpy()
+        if self.rows is not None:
+            codes = codes[self.rows]
+        counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+        return pd.Series(counts, index=series.cat.categories, name='count').sort_values(ascending=False)
+
+    def head(self, n=10):
+        return self.df.head(n) if self.rows is None else self.df.iloc[self.rows[:n]]
+
+
+class FilterEngine:
+    """Filtrage par index construits à la première utilisation de chaque colonne.
+
+    - colonnes numériques : valeurs triées et positions associées (recherche dichotomique) ;
+    - autres colonnes : positions des lignes regroupées par code de modalité.
+    Les prédicats sont combinés sous forme de masques booléens.
+    """
+
+    shared_attributes = ('df',)
+
+    def __init__(self, df):
+        self.df = df
+        self.n_rows = len(df)
+        self._ranges = {}
+        self._categories = {}
+
+    def _range_index(self, col):
+        if col not in self._ranges:
+            values = self.df[col].to_numpy(dtype='float64', na_value=np.nan)
+            positions = np.flatnonzero(~np.isnan(values))
+            positions = positions[np.argsort(values[positions], kind='stable')]
+            self._ranges[col] = (values[positions], positions)
+        return self._ranges[col]
+
+    def _category_index(self, col):
+        if col not in self._categories:
+            series = self.df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes, categories = series.cat.codes.to_numpy(), series.cat.categories
+            else:
+                codes, categories = pd.factorize(series)
+            valid = codes >= 0
+            positions = np.flatnonzero(valid)
+            positions = positions[np.argsort(codes[valid], kind='stable')]
+            counts = np.bincount(codes[valid], minlength=len(categories))
+            offsets = np.concatenate([[0], np.cumsum(counts)])
+            self._categories[col] = (categories, positions, offsets)
+        return self._categories[col]
+
+    def value_range(self, col):
+        sorted_values, _ = self._range_index(col)
+        if not len(sorted_values):
+            return 0.0, 0.0
+        return float(sorted_values[0]), float(sorted_values[-1])
+
+    def categories(self, col):
+        """Modalités présentes dans la colonne"""
+        categories, _, offsets = self._category_index(col)
+        return categories[np.diff(offsets) > 0].tolist()
+
+    def range_mask(self, col, low, high):
+        sorted_values, positions = self._range_index(col)
+        start = np.searchsorted(sorted_values, low, side='left')
+        stop = np.searchsorted(sorted_values, high, side='right')
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[positions[start:stop]] = True
+        return mask
+
+    def isin_mask(self, col, values):
+        categories, positions, offsets = self._category_index(col)
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for code in categories.get_indexer(list(values)):
+            if code >= 0:
+                mask[positions[offsets[code]:offsets[code + 1]]] = True
+        return mask
+
+    def apply(self, predicates):
+        """Prédicats : ('range', col, min, max) ou ('isin', col, valeurs)"""
+        if not predicates:
+            return FilteredView(self.df)
+        mask = None
+        for kind, col, *args in predicates:
+            current = self.range_mask(col, *args) if kind == 'range' else self.isin_mask(col, *args)
+            mask = current if mask is None else mask & current
+        return FilteredView(self.df, np.flatnonzero(mask), derive_key(*predicates))
+
+
+def get_filter_engine(df, fingerprint):
+    """Moteur de filtrage (et ses index) partagé par empreinte du jeu de données"""
+    return get_shared_cache().get_or_compute(('filters', fingerprint), lambda: FilterEngine(df))
@@ -0,0 +1,209 @@
+import numpy as np
+import pandas as pd
+
+from backend.cache import get_shared_cache
+from backend.perf import timed
+
+# Nombre maximal de périodes ajustées par série (la récursion est séquentielle dans le temps)
+MAX_PERIODS = 5_000
+
+# Fréquences proposées, de la plus fine à la plus grossière, avec leur durée approximative
+FREQUENCIES = {
+    'min': pd.Timedelta(minutes=1),
+    'h': pd.Timedelta(hours=1),
+    'D': pd.Timedelta(days=1),
+    'W': pd.Timedelta(days=7),
+    'MS': pd.Timedelta(days=30),
+    'QS': pd.Timedelta(days=91),
+    'YS': pd.Timedelta(days=365),
+}
+
+# Grilles de paramètres de lissage évaluées simultanément pour chaque série
+ALPHAS = np.array([0.1, 0.3, 0.5, 0.7, 0.9])
+BETAS = np.array([0.0, 0.05, 0.2])
+GAMMAS = np.array([0.05, 0.2, 0.5])
+
+Z_SCORES = {0.8: 1.2816, 0.9: 1.6449, 0.95: 1.96, 0.99: 2.5758}
+
+
+def parse_dates(series):
+    """Conversion en datetime (les valeurs non interprétables deviennent NaT)"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    return pd.to_datetime(series, errors='coerce')
+
+
+class TimeIndex:
+    """Dates analysées et triées une fois ; `order` donne les positions des lignes datées"""
+
+    def __init__(self, dates):
+        dates = parse_dates(dates).to_numpy()
+        valid = np.flatnonzero(~pd.isna(dates))
+        self.order = valid[np.argsort(dates[valid], kind='stable')]
+        self.dates = pd.DatetimeIndex(dates[self.order])
+
+    def __len__(self):
+        return len(self.order)
+
+    @property
+    def spacing(self):
+        """Écart médian entre deux dates distinctes"""
+        steps = np.sort(np.diff(self.dates.unique().to_numpy()))
+        return pd.Timedelta(steps[len(steps) // 2]) if len(steps) else pd.Timedelta(0)
+
+    def values(self, series):
+        """Valeurs d'une colonne alignées sur les dates triées"""
+        return series.iloc[self.order].set_axis(self.dates)
+
+
+def get_time_index(df, fingerprint, date_column):
+    return get_shared_cache().get_or_compute(
+        ('time_index', fingerprint, date_column), lambda: TimeIndex(df[date_column])
+    )
+
+
+def choose_frequency(time_index, max_periods=MAX_PERIODS):
+    """Fréquence la plus fine compatible avec l'écart natif et le nombre maximal de périodes"""
+    if not len(time_index):
+        return 'D'
+    span = time_index.dates[-1] - time_index.dates[0]
+    spacing = time_index.spacing
+    for freq, step in FREQUENCIES.items():
+        if step >= spacing * 0.5 and span / step <= max_periods:
+            return freq
+    return 'YS'
+
+
+def series_stats(series):
+    """Tendance, volatilité, dernière valeur et croissance d'une série ordonnée"""
+    series = series.dropna()
+    if series.empty:
+        raise ValueError("Aucune valeur exploitable dans la série")
+    first, last = series.iloc[0], series.iloc[-1]
+    return {
+        'trend': 'positive' if series.diff().mean() > 0 else 'negative',
+        'volatility': series.std(),
+        'last_value': last,
+        'growth_rate': (last - first) / first * 100 if first else np.nan,
+    }
+
+
+@timed()
+def time_series_forecast(df, date_column, value_column, fingerprint=None):
+    """Statistiques de base et série ordonnée ; lève ValueError si la série est inexploitable"""
+    time_index = get_time_index(df, fingerprint, date_column) if fingerprint is not None \
+        else TimeIndex(df[date_column])
+    if not len(time_index):
+        raise ValueError(f"Aucune date valide dans la colonne '{date_column}'")
+    ts_data = time_index.values(df[value_column]).dropna().to_frame()
+    return series_stats(ts_data[value_column]), ts_data
+
+
+def build_panel(df, time_index, value_columns, freq, group_column=None, agg='mean'):
+    """Séries régulières à la fréquence choisie : une colonne par variable ou par groupe"""
+    if group_column is None:
+        frame = df[list(value_columns)].iloc[time_index.order].set_axis(time_index.dates)
+        panel = frame.resample(freq).agg(agg)
+    else:
+        value = value_columns[0]
+        frame = df[[group_column, value]].iloc[time_index.order].set_axis(time_index.dates)
+        panel = (frame.groupby([pd.Grouper(freq=freq), group_column], observed=True)[value]
+                 .agg(agg).unstack(group_column))
+        panel = panel.asfreq(freq)
+        panel.columns = panel.columns.astype(str)
+    # Périodes vides comblées par interpolation pour garder une grille régulière
+    return panel.dropna(axis=1, how='all').interpolate(limit_direction='both')
+
+
+def _initial_state(Y, season_length):
+    # Niveau, tendance et saisonnalité initiaux à partir des deux premières saisons
+    m = season_length
+    if m > 1 and len(Y) >= 2 * m:
+        first, second = Y[:m].mean(axis=0), Y[m:2 * m].mean(axis=0)
+        return first, (second - first) / m, Y[:m] - first
+    trend = Y[1] - Y[0] if len(Y) > 1 else np.zeros(Y.shape[1])
+    return Y[0].copy(), trend, np.zeros((max(m, 1), Y.shape[1]))
+
+
+def holt_winters(Y, horizon, season_length=1, level=0.95):
+    """Holt-Winters additif ajusté sur toutes les séries (colonnes de Y) en une seule passe.
+
+    Les combinaisons (alpha, beta, gamma) de la grille sont évaluées ensemble ;
+    chaque série retient celle qui minimise l'erreur de prévision à un pas.
+    Retourne prévisions, bornes de l'intervalle (horizon × séries) et paramètres retenus.
+    """
+    Y = np.asarray(Y, dtype='float64')
+    n_periods, n_series = Y.shape
+    m = season_length if season_length and season_length > 1 and n_periods >= 2 * season_length else 1
+    gammas = GAMMAS if m > 1 else np.zeros(1)
+    alpha, beta, gamma = (g.reshape(-1, 1) for g in np.meshgrid(ALPHAS, BETAS, gammas, indexing='ij'))
+    n_grid = len(alpha)
+
+    level0, trend0, season0 = _initial_state(Y, m)
+    lvl = np.tile(level0, (n_grid, 1))
+    trend = np.tile(trend0, (n_grid, 1))
+    season = np.tile(season0[:, None, :], (1, n_grid, 1))
+    sse = np.zeros((n_grid, n_series))
+
+    # Récursion dans le temps, vectorisée sur (grille × séries)
+    for t in range(n_periods):
+        y = Y[t]
+        s = season[t % m]
+        error = y - (lvl + trend + s)
+        sse += error ** 2
+        new_level = alpha * (y - s) + (1 - alpha) * (lvl + trend)
+        trend = beta * (new_level - lvl) + (1 - beta) * trend
+        season[t % m] = gamma * (y - new_level) + (1 - gamma) * s
+        lvl = new_level
+
+    best = np.argmin(sse, axis=0)
+    cols = np.arange(n_series)
+    lvl, trend = lvl[best, cols], trend[best, cols]
+    a, b = alpha[best, 0], beta[best, 0]
+    sigma = np.sqrt(sse[best, cols] / max(n_periods, 1))
+
+    steps = np.arange(1, horizon + 1)[:, None]
+    season_idx = (n_periods + steps[:, 0] - 1) % m
+    forecast = lvl + steps * trend + season[season_idx][:, best, cols]
+    # Variance à h pas du modèle de Holt : sigma² (1 + Σ_{j<h} (alpha (1 + j beta))²)
+    factors = np.cumsum(np.vstack([np.zeros(n_series), (a * (1 + steps[:-1] * b)) ** 2]), axis=0)
+    width = Z_SCORES.get(level, 1.96) * sigma * np.sqrt(1 + factors)
+    params = pd.DataFrame({'alpha': a, 'beta': b, 'gamma': gamma[best, 0], 'rmse': sigma})
+    return forecast, forecast - width, forecast + width, params
+
+
+def forecast_panel(panel, horizon, season_length=1, level=0.95):
+    """Prévisions avec intervalles pour toutes les colonnes d'un panel régulier"""
+    if len(panel) < 3:
+        raise ValueError("Au moins trois périodes sont nécessaires pour une prévision")
+    forecast, lower, upper, params = holt_winters(panel.to_numpy(), horizon, season_length, level)
+    future = pd.date_range(panel.index[-1], periods=horizon + 1, freq=panel.index.freq)[1:]
+    params.index = panel.columns
+    return {
+        'forecast': pd.DataFrame(forecast, index=future, columns=panel.columns),
+        'lower': pd.DataFrame(lower, index=future, columns=panel.columns),
+        'upper': pd.DataFrame(upper, index=future, columns=panel.columns),
+        'params': params,
+    }
+
+
+@timed()
+def get_forecast(df, fingerprint, date_column, value_columns, freq=None, group_column=None,
+                 horizon=12, season_length=1, level=0.95):
+    """Panel et prévisions mis en cache par (jeu de données, colonnes, fréquence, paramètres)"""
+    time_index = get_time_index(df, fingerprint, date_column)
+    if not len(time_index):
+        raise ValueError(f"Aucune date valide dans la colonne '{date_column}'")
+    freq = freq or choose_frequency(time_index)
+
+    def compute():
+        panel = build_panel(df, time_index, value_columns, freq, group_column)
+        result = forecast_panel(panel, horizon, season_length, level)
+        result.update({'history': panel, 'freq': freq})
+        return result
+
+    return get_shared_cache().get_or_compute(
+        ('forecast', fingerprint, date_column, tuple(value_columns), group_column, freq,
+         horizon, season_length, level),
+        compute,
+    )
@@ -0,0 +1,154 @@
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Statuts des tâches
+PENDING = "en attente"
+RUNNING = "en cours"
+DONE = "terminée"
+FAILED = "échec"
+CANCELLED = "annulée"
+
+DEFAULT_WORKERS = int(os.environ.get("HEVITRA_JOB_WORKERS", "4"))
+DEFAULT_QUEUE = int(os.environ.get("HEVITRA_JOB_QUEUE", "32"))
+
+
+class JobCancelled(Exception):
+    """Levée dans une tâche dont l'annulation a été demandée"""
+
+
+class JobQueueFull(RuntimeError):
+    """File d'attente des tâches saturée"""
+
+
+class Job:
+    """Tâche de fond : statut, progression, résultat et annulation coopérative"""
+
+    def __init__(self, job_id, key, label):
+        self.id = job_id
+        self.key = key
+        self.label = label
+        self.status = PENDING
+        self.progress = 0.0
+        self.message = "En file d'attente"
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._cancel = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def check(self):
+        """Point d'annulation : lève JobCancelled si l'annulation a été demandée"""
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def report(self, progress, message=None):
+        """Mise à jour de la progression ; point d'annulation pour la tâche"""
+        self.check()
+        self.progress = min(max(float(progress), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+
+
+class JobManager:
+    """Pool de threads avec file bornée ; un résultat terminé est réutilisé pour la même clé.
+
+    Les résultats volumineux restent dans le cache partagé : une tâche ne renvoie que leur clé.
+    """
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, max_queued=DEFAULT_QUEUE, max_finished=100):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hevitra-job")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queued)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._jobs = OrderedDict()
+        self._by_key = {}
+        self.max_finished = max_finished
+
+    def submit(self, key, func, *args, label="", is_valid=None, **kwargs):
+        """Soumet `func(job, *args, **kwargs)` ; renvoie la tâche existante pour une clé déjà connue.
+
+        `is_valid(résultat)` revalide une tâche terminée avant réutilisation (entrée de cache
+        évincée, fichier supprimé) : un résultat périmé est recalculé.
+        """
+        with self._lock:
+            existing = self._jobs.get(self._by_key.get(key))
+            if existing is not None and existing.status not in (FAILED, CANCELLED) and \
+                    not (existing.status == DONE and is_valid is not None and not is_valid(existing.result)):
+                return existing
+            if not self._slots.acquire(blocking=False):
+                raise JobQueueFull("Trop de tâches en cours, réessayez dans un instant")
+            job = Job(f"job-{next(self._ids)}", key, label)
+            self._jobs[job.id] = job
+            self._by_key[key] = job.id
+            self._prune()
+        job.future = self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def _run(self, job, func, args, kwargs):
+        try:
+            if job._cancel.is_set():
+                raise JobCancelled()
+            job.status, job.started_at, job.message = RUNNING, time.time(), "En cours"
+            job.result = func(job, *args, **kwargs)
+            job.status, job.progress, job.message = DONE, 1.0, "Terminée"
+        except JobCancelled:
+            job.status, job.message = CANCELLED, "Annulée"
+        except Exception as e:
+            job.status, job.error, job.message = FAILED, str(e), "Échec"
+        finally:
+            job.finished_at = time.time()
+            self._slots.release()
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        job._cancel.set()
+        # Une tâche encore en file est retirée directement
+        if job.future is not None and job.future.cancel():
+            job.status, job.message, job.finished_at = CANCELLED, "Annulée", time.time()
+            self._slots.release()
+        return True
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if j.finished]
+        for job in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job.id]
+            if self._by_key.get(job.key) == job.id:
+                del self._by_key[job.key]
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    """Gestionnaire de tâches unique au processus, partagé par toutes les sessions"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
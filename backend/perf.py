@@ -0,0 +1,266 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Gestion de l'import optionnel de `resource` (pic de mémoire résidente, absent sous Windows)
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+# Mesures désactivables ; tracemalloc (pic Python/NumPy par étape) est précis mais ralentit les calculs
+PERF_ENABLED = os.environ.get("HEVITRA_PERF", "1") != "0"
+TRACE_MEMORY = os.environ.get("HEVITRA_PERF_TRACEMALLOC", "0") == "1"
+# Durées conservées par étape pour les percentiles
+HISTORY = 1000
+# Bornes (s) de l'histogramme Prometheus
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRIC_PREFIX = "hevitra_stage"
+
+if TRACE_MEMORY and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+# Étapes ouvertes dans le thread courant (imbrication) et exécution en cours
+_context = threading.local()
+
+
+def count_rows(obj):
+    """Nombre de lignes d'un DataFrame, d'un tableau, d'une vue filtrée ou d'un profil ; None sinon"""
+    if hasattr(obj, 'n_rows'):
+        return int(obj.n_rows)
+    if isinstance(obj, np.ndarray) or hasattr(obj, 'iloc'):
+        return len(obj)
+    return None
+
+
+def _peak_rss():
+    # Pic de mémoire résidente du processus (octets) ; ru_maxrss est en Ko sous Linux
+    if not RESOURCE_AVAILABLE:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class StageRecord:
+    """Mesure d'une étape : durée, lignes traitées et hausse du pic mémoire"""
+
+    def __init__(self, name, rows=None, depth=0):
+        self.name = name
+        self.rows = rows
+        self.depth = depth
+        self.seconds = 0.0
+        self.memory = 0
+        self.started_at = time.time()
+        self._peak = 0
+        self._start_memory = 0
+
+    def as_dict(self):
+        return {
+            'stage': self.name,
+            'seconds': self.seconds,
+            'rows': self.rows,
+            'memory': self.memory,
+            'depth': self.depth,
+            'started_at': self.started_at,
+        }
+
+
+class StageStats:
+    """Agrégats d'une étape sur la durée de vie du processus"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.max_memory = 0
+        self.buckets = [0] * len(BUCKETS)
+        self.recent = deque(maxlen=HISTORY)
+
+    def add(self, record):
+        self.count += 1
+        self.total += record.seconds
+        self.max = max(self.max, record.seconds)
+        self.rows += record.rows or 0
+        self.max_memory = max(self.max_memory, record.memory)
+        for i, bound in enumerate(BUCKETS):
+            if record.seconds <= bound:
+                self.buckets[i] += 1
+        self.recent.append(record.seconds)
+
+    def percentile(self, q):
+        return float(np.percentile(self.recent, q)) if self.recent else 0.0
+
+
+class PerfRecorder:
+    """Mesures par étape : agrégats du processus et dernière exécution de chaque session"""
+
+    def __init__(self, max_sessions=200):
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._stats = OrderedDict()
+        self._runs = OrderedDict()
+
+    def begin_run(self, session_id, new_run=True):
+        """Rattache les étapes du thread courant à l'exécution de la session"""
+        with self._lock:
+            if new_run or session_id not in self._runs:
+                self._runs[session_id] = []
+                self._runs.move_to_end(session_id)
+                while len(self._runs) > self.max_sessions:
+                    self._runs.popitem(last=False)
+            _context.run = (self, self._runs[session_id])
+
+    def add(self, record):
+        with self._lock:
+            self._stats.setdefault(record.name, StageStats()).add(record)
+            owner, run = getattr(_context, 'run', (None, None))
+            if owner is self:
+                run.append(record)
+
+    def last_run(self, session_id):
+        """Étapes de la dernière exécution de la session, dans l'ordre d'ouverture"""
+        with self._lock:
+            return sorted(self._runs.get(session_id, []), key=lambda r: r.started_at)
+
+    def summary(self):
+        """Agrégats par étape (dict sérialisable)"""
+        with self._lock:
+            return {
+                name: {
+                    'count': s.count,
+                    'total_seconds': s.total,
+                    'mean_seconds': s.total / s.count,
+                    'p50_seconds': s.percentile(50),
+                    'p95_seconds': s.percentile(95),
+                    'max_seconds': s.max,
+                    'rows': s.rows,
+                    'max_memory_bytes': s.max_memory,
+                }
+                for name, s in self._stats.items()
+            }
+
+    def to_json(self, session_id=None):
+        payload = {'generated_at': time.time(), 'stages': self.summary()}
+        if session_id is not None:
+            payload['last_run'] = [r.as_dict() for r in self.last_run(session_id)]
+        return json.dumps(payload, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        """Format texte d'exposition Prometheus (histogramme des durées, lignes, pic mémoire)"""
+        def label(name):
+            escaped = name.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            return f'stage="{escaped}"'
+
+        with self._lock:
+            stats = list(self._stats.items())
+        lines = [
+            f"# HELP {METRIC_PREFIX}_duration_seconds Durée des étapes d'analyse",
+            f"# TYPE {METRIC_PREFIX}_duration_seconds histogram",
+        ]
+        for name, s in stats:
+            for bound, count in zip(BUCKETS, s.buckets):
+                lines.append(f'{METRIC_PREFIX}_duration_seconds_bucket{{{label(name)},le="{bound}"}} {count}')
+            lines.append(f'{METRIC_PREFIX}_duration_seconds_bucket{{{label(name)},le="+Inf"}} {s.count}')
+            lines.append(f"{METRIC_PREFIX}_duration_seconds_sum{{{label(name)}}} {s.total}")
+            lines.append(f"{METRIC_PREFIX}_duration_seconds_count{{{label(name)}}} {s.count}")
+        lines += [
+            f"# HELP {METRIC_PREFIX}_rows_total Lignes traitées par les étapes",
+            f"# TYPE {METRIC_PREFIX}_rows_total counter",
+        ]
+        lines += [f"{METRIC_PREFIX}_rows_total{{{label(name)}}} {s.rows}" for name, s in stats]
+        lines += [
+            f"# HELP {METRIC_PREFIX}_memory_peak_bytes Plus forte hausse du pic mémoire observée",
+            f"# TYPE {METRIC_PREFIX}_memory_peak_bytes gauge",
+        ]
+        lines += [f"{METRIC_PREFIX}_memory_peak_bytes{{{label(name)}}} {s.max_memory}" for name, s in stats]
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._runs.clear()
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder():
+    """Enregistreur unique au processus, partagé par toutes les sessions"""
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = PerfRecorder()
+        return _recorder
+
+
+def _open_stages():
+    if not hasattr(_context, 'stack'):
+        _context.stack = []
+    return _context.stack
+
+
+def _update_peaks(stack):
+    # Pic tracemalloc depuis la dernière remise à zéro, reporté sur toutes les étapes ouvertes
+    _, peak = tracemalloc.get_traced_memory()
+    for record in stack:
+        record._peak = max(record._peak, peak)
+    tracemalloc.reset_peak()
+
+
+@contextmanager
+def stage(name, rows=None, recorder=None):
+    """Mesure d'une étape ; `record.rows` peut être renseigné dans le bloc.
+
+    Sans tracemalloc, la mémoire est la hausse du pic de mémoire résidente du processus :
+    nulle tant que l'étape ne dépasse pas le pic déjà atteint.
+    """
+    record = StageRecord(name, rows)
+    if not PERF_ENABLED:
+        yield record
+        return
+    stack = _open_stages()
+    record.depth = len(stack)
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        _update_peaks(stack)
+        record._start_memory = tracemalloc.get_traced_memory()[0]
+    else:
+        record._start_memory = _peak_rss()
+    stack.append(record)
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.seconds = time.perf_counter() - started
+        if tracing:
+            _update_peaks(stack)
+            record.memory = max(record._peak - record._start_memory, 0)
+        else:
+            record.memory = max(_peak_rss() - record._start_memory, 0)
+        if stack and stack[-1] is record:
+            stack.pop()
+        (recorder or get_recorder()).add(record)
+
+
+def timed(name=None):
+    """Décorateur : mesure chaque appel ; les lignes sont lues sur le premier argument"""
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            with stage(label, count_rows(args[0]) if args else None):
+                return func(*args, **kwargs)
+        return run
+    return decorate
@@ -0,0 +1,241 @@
+import hashlib
+import html
+import json
+import os
+import time
+from datetime import datetime
+
+from backend.cache import derive_key, get_shared_cache
+from backend.clustering import cluster_counts, perform_clustering
+from backend.correlation import STRONG_CORRELATION, get_correlation
+from backend.data_analysis import (
+    cache_row_index, detect_anomalies, get_outlier_mask, get_profile, get_row_index
+)
+from backend.data_loader import PYARROW_AVAILABLE, ingest
+from backend.filters import FilteredView
+from backend.perf import get_recorder, stage, timed
+
+
+@timed()
+def generate_insights(profile, correlation=None):
+    """Génération automatique d'insights à partir du profil (et des corrélations déjà calculées)"""
+    insights = []
+
+    # Insight sur les données manquantes
+    if profile.missing_percentage > 10:
+        insights.append(f"⚠️ **Données manquantes** : {profile.missing_percentage:.1f}% des valeurs sont manquantes")
+
+    # Insight sur les doublons
+    if profile.duplicate_count > 0:
+        insights.append(f"🔍 **Doublons** : {profile.duplicate_count} lignes dupliquées détectées")
+
+    # Insight sur les colonnes numériques
+    if profile.numeric_columns:
+        high_variance_cols = []
+        stats = profile.numeric_stats
+        for col in profile.numeric_columns:
+            if stats.loc['std', col] / stats.loc['mean', col] > 2:  # Coefficient de variation élevé
+                high_variance_cols.append(col)
+        if high_variance_cols:
+            insights.append(f"📊 **Variance élevée** : {', '.join(high_variance_cols[:3])}")
+
+    # Insight sur les colonnes fortement corrélées (redondantes)
+    if correlation is not None:
+        pairs = correlation.top_pairs(3, min_abs=STRONG_CORRELATION)
+        if not pairs.empty:
+            described = [f"{row['Colonne 1']} ↔ {row['Colonne 2']} ({row['Corrélation']:.2f})"
+                         for _, row in pairs.iterrows()]
+            insights.append(f"🔗 **Corrélations fortes** : {', '.join(described)}")
+
+    return insights
+
+
+@timed()
+def clean_dataset(data, data_key, row_index, dedup_subset=None):
+    """Suppression des colonnes vides et des doublons (à partir des empreintes de lignes).
+
+    Retourne (données, empreinte, index des lignes, nombre de doublons, nombre de colonnes vides) ;
+    l'empreinte n'est dérivée que si les données ont changé. Le résultat est partagé entre sessions.
+    """
+    dedup_subset = list(dedup_subset or [])
+
+    def compute():
+        cleaned, key, index = data, data_key, row_index
+        dedup_index = get_row_index(data, data_key, dedup_subset) if dedup_subset else row_index
+        # Supprimer les colonnes vides
+        cleaned = cleaned.dropna(axis=1, how='all')
+        # Supprimer les doublons à partir des empreintes (pas de nouveau parcours des données)
+        keep = ~dedup_index.duplicated
+        if not keep.all():
+            cleaned = cleaned[keep]
+            index = index.take(keep)
+        if data.shape != cleaned.shape:
+            key = derive_key(data_key, 'auto_clean', tuple(dedup_subset))
+            cache_row_index(key, index)
+        return cleaned, key, index, data.shape[0] - cleaned.shape[0], data.shape[1] - cleaned.shape[1]
+
+    return get_shared_cache().get_or_compute(('clean', data_key, tuple(dedup_subset)), compute)
+
+
+def build_report(file_name, profile, insights):
+    """Rapport texte sommaire"""
+    return f"""
+                RAPPORT D'ANALYSE - HevitraVizor+
+                =================================
+
+                Date de génération : {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+                Fichier source : {file_name}
+
+                MÉTRIQUES PRINCIPALES :
+                - Lignes : {profile.n_rows}
+                - Colonnes : {profile.n_cols}
+                - Données manquantes : {profile.total_missing} ({profile.missing_percentage:.1f}%)
+                - Colonnes numériques : {len(profile.numeric_columns)}
+                - Colonnes catégorielles : {len(profile.categorical_columns)}
+
+                INSIGHTS :
+                {chr(10).join(insights)}
+
+                Ce rapport a été généré automatiquement par HevitraVizor+.
+                """
+
+
+def json_default(value):
+    # Scalaires NumPy / pandas et autres objets (dates, intervalles)
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+def report_html(summary):
+    """Rapport HTML autonome à partir du résumé d'analyse"""
+    def table(rows):
+        if not rows:
+            return "<p>—</p>"
+        header = ''.join(f"<th>{html.escape(str(k))}</th>" for k in rows[0])
+        body = ''.join('<tr>' + ''.join(f"<td>{html.escape(str(v))}</td>" for v in row.values()) + '</tr>'
+                       for row in rows)
+        return f"<table><tr>{header}</tr>{body}</table>"
+
+    insights = ''.join(
+        f"<li>{html.escape(insight).replace('**', '')}</li>" for insight in summary['insights']
+    )
+    anomalies = [{'Colonne': col, **values} for col, values in summary['anomalies'].items()]
+    clusters = [{'Cluster': k, 'Effectif': v} for k, v in (summary.get('clusters') or {}).items()]
+    timings = [{'Étape': k, 'Durée (s)': f"{v:.3f}"} for k, v in summary['timings'].items()]
+    return f"""<!DOCTYPE html>
+<html lang="fr"><head><meta charset="utf-8"><title>Rapport - {html.escape(summary['file'])}</title>
+<style>body{{font-family:'Segoe UI',sans-serif;color:#2c3e50;margin:2rem}}
+table{{border-collapse:collapse;margin-bottom:1.5rem}}td,th{{border:1px solid #e9ecef;padding:4px 10px}}
+th{{background:#f8f9fa}}</style></head><body>
+<h1>Rapport d'analyse - HevitraVizor+</h1>
+<p>Fichier source : {html.escape(summary['file'])} • généré le {html.escape(summary['generated_at'])}</p>
+<h2>Métriques principales</h2>
+{table([{'Lignes': summary['rows'], 'Colonnes': summary['columns'],
+         'Données manquantes': summary['missing'], 'Manquantes (%)': f"{summary['missing_percentage']:.1f}",
+         'Doublons supprimés': summary['duplicates_removed'],
+         'Colonnes vides supprimées': summary['empty_columns_removed']}])}
+<h2>Insights</h2><ul>{insights or '<li>Aucun</li>'}</ul>
+<h2>Valeurs aberrantes</h2>{table(anomalies)}
+<h2>Corrélations les plus fortes</h2>{table(summary['top_correlations'])}
+<h2>Clusters</h2>{table(clusters)}
+<h2>Temps par étape</h2>{table(timings)}
+</body></html>
+"""
+
+
+def output_stem(path):
+    """Nom de base des sorties : nom du fichier suivi d'une empreinte de son chemin complet
+    (deux fichiers homonymes de répertoires différents, ou a.csv et a.xlsx, ne s'écrasent pas)"""
+    digest = hashlib.blake2b(os.path.abspath(path).encode('utf-8'), digest_size=4).hexdigest()
+    return f"{os.path.splitext(os.path.basename(path))[0]}-{digest}"
+
+
+def analyse_file(path, output_dir, clean=True, detect_types=True, encode=True, n_clusters=None,
+                 formats=('json', 'html', 'parquet')):
+    """Pipeline complet sans interface : chargement, nettoyage, profil, anomalies, insights,
+    clustering optionnel et rapports. Retourne le résumé (avec les mesures par étape)."""
+    recorder = get_recorder()
+    recorder.begin_run(path)
+    started = time.perf_counter()
+
+    with stage('chargement') as record:
+        with open(path, 'rb') as handle:
+            content = handle.read()
+        file_name = os.path.basename(path)
+        data_key, data, _ = ingest(content, file_name, detect_types=detect_types, encode=encode)
+        record.rows = len(data)
+
+    duplicates = empty_columns = 0
+    if clean:
+        with stage('nettoyage', len(data)):
+            row_index = get_row_index(data, data_key)
+            data, data_key, row_index, duplicates, empty_columns = clean_dataset(data, data_key, row_index)
+
+    with stage('analyse', len(data)):
+        profile = get_profile(data, data_key)
+        correlation = None
+        if len(profile.numeric_columns) >= 2:
+            correlation = get_correlation(FilteredView(data), data_key, profile.numeric_columns)
+        anomalies = {}
+        if profile.numeric_columns:
+            outlier_mask = get_outlier_mask(data, data_key, profile.numeric_columns)
+            anomalies = detect_anomalies(data, profile.numeric_columns, outlier_mask)
+        insights = generate_insights(profile, correlation)
+
+    clusters = None
+    if n_clusters and len(profile.numeric_columns) >= 2:
+        with stage('clustering', len(data)):
+            clustering = perform_clustering(data, profile.numeric_columns, n_clusters, fingerprint=data_key)
+            clusters = {int(k): int(v) for k, v in cluster_counts(clustering['labels']).items()}
+            data = data.assign(Cluster=clustering['labels'])
+
+    summary = {
+        'file': file_name,
+        'path': os.path.abspath(path),
+        'output': output_stem(path),
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'rows': profile.n_rows,
+        'columns': profile.n_cols,
+        'bytes': len(content),
+        'missing': profile.total_missing,
+        'missing_percentage': profile.missing_percentage,
+        'duplicates_removed': duplicates,
+        'empty_columns_removed': empty_columns,
+        'dtypes': {str(k): int(v) for k, v in profile.dtype_counts.items()},
+        'numeric_stats': profile.numeric_stats.to_dict() if profile.numeric_columns else {},
+        'anomalies': anomalies,
+        'insights': insights,
+        'top_correlations': correlation.top_pairs(10).to_dict('records') if correlation is not None else [],
+        'clusters': clusters,
+        'report': build_report(file_name, profile, insights),
+    }
+
+    # Durées des étapes terminées (le rapport HTML ne comprend pas l'écriture elle-même)
+    summary['timings'] = _timings(recorder.last_run(path))
+
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.join(output_dir, summary['output'])
+    with stage('écriture', len(data)):
+        if 'parquet' in formats and PYARROW_AVAILABLE:
+            data.to_parquet(stem + '.parquet', index=False)
+        if 'html' in formats:
+            with open(stem + '.html', 'w', encoding='utf-8') as handle:
+                handle.write(report_html(summary))
+
+    elapsed = time.perf_counter() - started
+    records = recorder.last_run(path)
+    summary.update({
+        'timings': _timings(records),
+        'perf': [r.as_dict() for r in records],
+        'elapsed': elapsed,
+        'rows_per_second': profile.n_rows / elapsed if elapsed else 0.0,
+        'mb_per_second': len(content) / 1024 ** 2 / elapsed if elapsed else 0.0,
+    })
+    if 'json' in formats:
+        with open(stem + '.json', 'w', encoding='utf-8') as handle:
+            json.dump(summary, handle, ensure_ascii=False, indent=2, default=json_default)
+    return summary
+
+
+def _timings(records):
+    # Durées des étapes de premier niveau (les fonctions mesurées à l'intérieur sont détaillées dans `perf`)
+    return {r.name: r.seconds for r in records if r.depth == 0}
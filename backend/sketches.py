@@ -0,0 +1,229 @@
+import numpy as np
+import pandas as pd
+
+
+def _hash_series(series):
+    # Hachage 64 bits stable d'un bloc à l'autre, quel que soit le type compact retenu
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return pd.util.hash_array(series.to_numpy(dtype='float64', na_value=np.nan))
+    return pd.util.hash_pandas_object(series, index=False).to_numpy()
+
+
+class KLLSketch:
+    """Esquisse de quantiles KLL : mémoire O(k), fusionnable, erreur de rang ~ 2.3 / k^0.97"""
+
+    def __init__(self, k=200, seed=42):
+        self.k = k
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def rank_error(self):
+        # Approximation empirique de l'erreur de rang normalisée (confiance 99 %)
+        return 2.296 / self.k ** 0.9723
+
+    def update(self, values):
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.n += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) <= self._capacity(h):
+                h += 1
+                continue
+            if h + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            # Compaction : on garde un élément sur deux (décalage aléatoire), de poids double
+            items = np.sort(items)
+            even = len(items) - len(items) % 2
+            promoted = items[self._rng.integers(2):even:2]
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            self.levels[h] = items[even:]
+            h = 0
+
+    def quantiles(self, qs):
+        qs = np.atleast_1d(qs)
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(lvl), 2 ** h) for h, lvl in enumerate(self.levels)])
+        order = np.argsort(items)
+        items, cumulative = items[order], np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, qs * cumulative[-1], side='left')
+        result = items[np.minimum(positions, len(items) - 1)]
+        # Les extrêmes sont connus exactement
+        result[qs <= 0] = self.min
+        result[qs >= 1] = self.max
+        return result
+
+
+class HyperLogLog:
+    """Comptage approximatif des valeurs distinctes, erreur relative ~ 1.04 / sqrt(2^p)"""
+
+    def __init__(self, p=14):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    @property
+    def relative_error(self):
+        return 1.04 / np.sqrt(self.m)
+
+    def update_hashes(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        idx = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = (hashes << np.uint64(self.p)) | np.uint64(1 << (self.p - 1))
+        # Position du bit de poids fort via l'exposant flottant
+        msb = np.minimum(np.frexp(rest.astype('float64'))[1] - 1, 63)
+        rho = (64 - msb).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rho)
+        return self
+
+    def update(self, series):
+        return self.update_hashes(_hash_series(series.dropna()))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m ** 2 / np.sum(np.ldexp(1.0, -self.registers.astype(int)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * self.m and zeros:
+            # Correction petites cardinalités (comptage linéaire)
+            estimate = self.m * np.log(self.m / zeros)
+        return int(round(estimate))
+
+
+class TopKSketch:
+    """Modalités les plus fréquentes (résumé fusionnable de type Space-Saving)"""
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.n = 0
+        self.error = 0
+        self.counts = pd.Series(dtype='int64')
+
+    def update(self, series):
+        counts = series.value_counts(dropna=True)
+        counts.index = counts.index.astype(object)
+        self.n += int(counts.sum())
+        return self._absorb(counts, 0)
+
+    def merge(self, other):
+        self.n += other.n
+        return self._absorb(other.counts, other.error)
+
+    def _absorb(self, counts, other_error):
+        combined = pd.concat([self.counts, counts]).groupby(level=0).sum()
+        self.error += other_error
+        if len(combined) > self.capacity:
+            combined = combined.sort_values(ascending=False)
+            # Les modalités écartées peuvent avoir au plus ce compte
+            self.error += int(combined.iloc[self.capacity])
+            combined = combined.iloc[:self.capacity]
+        self.counts = combined.astype('int64')
+        return self
+
+    def top(self, k=10):
+        return self.counts.sort_values(ascending=False).head(k)
+
+
+class DatasetSketch:
+    """Esquisses par colonne, construites bloc par bloc et fusionnables"""
+
+    def __init__(self, k=200, p=14, top_capacity=256):
+        self.k, self.p, self.top_capacity = k, p, top_capacity
+        self.n_rows = 0
+        self.nulls = {}
+        self.quantiles = {}
+        self.distinct = {}
+        self.top = {}
+
+    def update(self, chunk):
+        self.n_rows += len(chunk)
+        for col in chunk.columns:
+            series = chunk[col]
+            self.nulls[col] = self.nulls.get(col, 0) + int(series.isna().sum())
+            self.distinct.setdefault(col, HyperLogLog(self.p)).update(series)
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                self.quantiles.setdefault(col, KLLSketch(self.k)).update(series.to_numpy(dtype='float64', na_value=np.nan))
+            else:
+                self.top.setdefault(col, TopKSketch(self.top_capacity)).update(series)
+        return self
+
+    def merge(self, other):
+        self.n_rows += other.n_rows
+        for col, count in other.nulls.items():
+            self.nulls[col] = self.nulls.get(col, 0) + count
+        for attr in ['quantiles', 'distinct', 'top']:
+            mine = getattr(self, attr)
+            for col, sketch in getattr(other, attr).items():
+                if col in mine:
+                    mine[col].merge(sketch)
+                else:
+                    mine[col] = sketch
+        return self
+
+    @classmethod
+    def from_frame(cls, df, chunk_rows=200_000, **params):
+        sketch = cls(**params)
+        for start in range(0, len(df), chunk_rows):
+            sketch.update(df.iloc[start:start + chunk_rows])
+        return sketch
+
+    def quartiles(self, columns):
+        """Quartiles approchés au format de `DataFrame.quantile([0.25, 0.5, 0.75])`"""
+        qs = [0.25, 0.5, 0.75]
+        return pd.DataFrame({col: self.quantiles[col].quantiles(qs) for col in columns}, index=qs)
+
+    def describe(self):
+        """Statistiques approchées avec leurs bornes d'erreur"""
+        rows = {}
+        for col in self.nulls:
+            hll = self.distinct[col]
+            row = {
+                'count': self.n_rows - self.nulls[col],
+                'distinct ≈': hll.estimate(),
+                'erreur distinct': f"±{hll.relative_error:.1%}",
+            }
+            if col in self.quantiles:
+                kll = self.quantiles[col]
+                q = kll.quantiles([0.25, 0.5, 0.75])
+                row.update({'min': kll.min, '25% ≈': q[0], '50% ≈': q[1], '75% ≈': q[2], 'max': kll.max,
+                            'erreur quantiles': f"±{kll.rank_error:.1%} du rang"})
+            if col in self.top and len(self.top[col].counts):
+                top = self.top[col].top(1)
+                row.update({'top ≈': top.index[0], 'freq ≈': int(top.iloc[0]),
+                            'erreur freq': f"±{self.top[col].error}"})
+            rows[col] = row
+        return pd.DataFrame(rows)
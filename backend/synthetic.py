@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+# Colonnes du jeu d'exemple historique ; les colonnes supplémentaires alternent mesures et catégories
+BASE_COLUMNS = ['Date', 'Ventes', 'Clients', 'Region', 'Produit', 'Satisfaction']
+REGIONS = ['Nord', 'Sud', 'Est', 'Ouest']
+PRODUITS = ['A', 'B', 'C', 'D']
+# Facteur appliqué aux valeurs aberrantes injectées
+OUTLIER_SCALE = 10.0
+
+
+def _labels(base, cardinality, prefix):
+    # Modalités de référence complétées au besoin (Nord, Sud, ..., Region_5, ...)
+    if cardinality <= len(base):
+        return base[:cardinality]
+    return base + [f"{prefix}_{i + 1}" for i in range(len(base), cardinality)]
+
+
+def _categorical(rng, n_rows, labels):
+    codes = rng.integers(0, len(labels), n_rows)
+    return pd.Categorical.from_codes(codes, categories=labels)
+
+
+def generate_dataset(n_rows=100, n_columns=6, cardinality=4, null_rate=0.0, duplicate_rate=0.0,
+                     outlier_rate=0.0, start='2023-01-01', span_days=None, seed=42):
+    """Jeu de données synthétique reproductible (ventes par région et produit).
+
+    - `n_columns` : au moins les 6 colonnes d'exemple, puis `Mesure_k` / `Categorie_k` en alternance ;
+    - `cardinality` : modalités des colonnes catégorielles (entier ou dict colonne -> entier) ;
+    - `null_rate`, `duplicate_rate`, `outlier_rate` : parts de cellules manquantes, de lignes
+      dupliquées et de valeurs numériques aberrantes ;
+    - `span_days` : période couverte par `Date` (par défaut un jour par ligne, plafonné à 10 ans).
+    """
+    rng = np.random.default_rng(seed)
+    n_columns = max(int(n_columns), len(BASE_COLUMNS))
+
+    def cardinality_of(col):
+        return int(cardinality.get(col, 4) if isinstance(cardinality, dict) else cardinality)
+
+    if span_days is None:
+        span_days = min(n_rows - 1, 3650)
+    offsets = np.linspace(0, span_days * 86_400, n_rows).astype('int64')
+    columns = {
+        'Date': pd.Timestamp(start) + pd.to_timedelta(offsets, unit='s'),
+        'Ventes': rng.normal(1000, 200, n_rows).cumsum(),
+        'Clients': rng.integers(50, 150, n_rows),
+        'Region': _categorical(rng, n_rows, _labels(REGIONS, cardinality_of('Region'), 'Region')),
+        'Produit': _categorical(rng, n_rows, _labels(PRODUITS, cardinality_of('Produit'), 'Produit')),
+        'Satisfaction': rng.integers(1, 6, n_rows),
+    }
+    for i in range(n_columns - len(BASE_COLUMNS)):
+        k = i // 2 + 1
+        if i % 2 == 0:
+            columns[f'Mesure_{k}'] = rng.normal(100 * k, 10 * k, n_rows).astype('float32')
+        else:
+            name = f'Categorie_{k}'
+            columns[name] = _categorical(rng, n_rows, [f"{name}_{j + 1}" for j in range(cardinality_of(name))])
+    df = pd.DataFrame(columns)
+
+    numeric = [c for c in df.columns if c != 'Date' and pd.api.types.is_numeric_dtype(df[c])]
+    if outlier_rate > 0:
+        for col in numeric:
+            rows = rng.random(n_rows) < outlier_rate
+            values = df[col].to_numpy(dtype='float64', copy=True)
+            # Écart de plusieurs IQR autour de la médiane, dans les deux sens (quartiles sur échantillon)
+            q1, median, q3 = np.percentile(values[::max(n_rows // 100_000, 1)], [25, 50, 75])
+            signs = rng.choice([-1.0, 1.0], int(rows.sum()))
+            values[rows] = median + signs * OUTLIER_SCALE * ((q3 - q1) or 1.0)
+            df[col] = values
+
+    if null_rate > 0:
+        for col in df.columns[1:]:
+            df[col] = df[col].mask(rng.random(n_rows) < null_rate)
+
+    if duplicate_rate > 0:
+        # Lignes remplacées par des copies d'autres lignes : le nombre de lignes est conservé
+        positions = np.arange(n_rows)
+        duplicated = np.flatnonzero(rng.random(n_rows) < duplicate_rate)
+        positions[duplicated] = rng.integers(0, n_rows, len(duplicated))
+        df = df.take(positions).reset_index(drop=True)
+    return df
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+# Nombre de valeurs examinées par colonne et part minimale de valeurs reconnues
+SAMPLE_ROWS = 1_000
+MIN_MATCH = 0.95
+# Au-delà de cette part de valeurs non converties sur la colonne complète, la conversion est annulée
+MAX_COERCED = 0.05
+
+DATE_FORMATS = [
+    '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M',
+    '%d/%m/%Y', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%m/%d/%Y', '%Y/%m/%d',
+    '%d-%m-%Y', '%d.%m.%Y', 'ISO8601',
+]
+
+# Formats jour/mois/année réécrits en ISO (voie rapide de `to_datetime`) par une substitution vectorisée
+ISO_REWRITES = {
+    '%d/%m/%Y': r'\3-\2-\1', '%d-%m-%Y': r'\3-\2-\1', '%d.%m.%Y': r'\3-\2-\1', '%m/%d/%Y': r'\3-\1-\2',
+}
+
+BOOLEAN_VALUES = {
+    'true': True, 'false': False, 'vrai': True, 'faux': False,
+    'oui': True, 'non': False, 'yes': True, 'no': False,
+}
+
+
+def _sample(values, sample_rows):
+    # Échantillon réparti sur toute la colonne (pas seulement les premières lignes)
+    if len(values) > sample_rows:
+        values = values.iloc[np.linspace(0, len(values) - 1, sample_rows).astype(np.int64)]
+    return values.dropna().astype(str).str.strip()
+
+
+def _text_values(series):
+    """Valeurs distinctes à analyser : les modalités pour une colonne catégorielle"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return pd.Series(series.cat.categories)
+    return series
+
+
+def _match_rate(parsed, sample):
+    return parsed.notna().sum() / len(sample)
+
+
+def _numeric_text(values):
+    # Séparateurs de milliers (espaces) et virgule décimale
+    return values.str.replace(r'[\s  ]', '', regex=True).str.replace(',', '.', regex=False)
+
+
+def infer_column(series, sample_rows=SAMPLE_ROWS):
+    """Type détecté sur un échantillon borné : dict (kind, format) ou None si rien à convertir"""
+    if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+            or isinstance(series.dtype, pd.CategoricalDtype)):
+        return None
+    sample = _sample(_text_values(series), sample_rows)
+    sample = sample[sample != '']
+    if sample.empty:
+        return None
+
+    if sample.str.lower().isin(BOOLEAN_VALUES.keys()).mean() >= MIN_MATCH:
+        return {'kind': 'boolean', 'format': None}
+
+    # Zéros initiaux (codes postaux, références) : la colonne reste textuelle
+    if not sample.str.match(r'-?0\d').any():
+        if _match_rate(pd.to_numeric(sample, errors='coerce'), sample) >= MIN_MATCH:
+            return {'kind': 'numeric', 'format': None}
+        if sample.str.contains(',', regex=False).any() and \
+                _match_rate(pd.to_numeric(_numeric_text(sample), errors='coerce'), sample) >= MIN_MATCH:
+            return {'kind': 'numeric', 'format': 'virgule décimale'}
+
+    # Format explicite : la conversion complète évite la détection valeur par valeur
+    if sample.str.contains(r'\d', regex=True).mean() >= MIN_MATCH:
+        for fmt in DATE_FORMATS:
+            if _match_rate(pd.to_datetime(sample, format=fmt, errors='coerce'), sample) >= MIN_MATCH:
+                return {'kind': 'datetime', 'format': fmt}
+
+    if not isinstance(series.dtype, pd.CategoricalDtype) and len(sample) >= 50 \
+            and sample.nunique() >= MIN_MATCH * len(sample):
+        return {'kind': 'identifier', 'format': None}
+    return None
+
+
+def convert_column(series, inference):
+    """Conversion typée de la colonne complète ; les modalités sont converties une seule fois"""
+    kind, fmt = inference['kind'], inference['format']
+    codes = None
+    values = series
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, values = series.cat.codes.to_numpy(), pd.Series(series.cat.categories)
+
+    if kind == 'identifier':
+        return series.astype('string')
+    text = values.astype(str).str.strip().where(values.notna())
+    if kind == 'boolean':
+        converted = text.str.lower().map(BOOLEAN_VALUES).astype('boolean')
+    elif kind == 'numeric':
+        converted = pd.to_numeric(_numeric_text(text) if fmt else text, errors='coerce')
+    else:
+        prefix = fmt[:8]
+        if prefix in ISO_REWRITES:
+            text = text.str.replace(r'^(\d{2})[/.-](\d{2})[/.-](\d{4})', ISO_REWRITES[prefix], regex=True)
+            fmt = '%Y-%m-%d' + fmt[8:]
+        converted = pd.to_datetime(text, format=fmt, errors='coerce')
+
+    if codes is not None:
+        converted = converted.take(np.where(codes >= 0, codes, 0))
+        converted = converted.where(codes >= 0)
+    return pd.Series(converted.array, index=series.index, name=series.name)
+
+
+def infer_types(df, sample_rows=SAMPLE_ROWS):
+    """Types détectés par colonne ; les colonnes sans conversion sont omises"""
+    inferred = {}
+    for col in df.columns:
+        inference = infer_column(df[col], sample_rows)
+        if inference is not None:
+            inferred[col] = inference
+    return inferred
+
+
+def apply_types(df, sample_rows=SAMPLE_ROWS):
+    """Détection puis conversion en une passe ; retourne (DataFrame, rapport par colonne)"""
+    report = []
+    for col, inference in infer_types(df, sample_rows).items():
+        series = df[col]
+        converted = convert_column(series, inference)
+        coerced = int(converted.isna().sum() - series.isna().sum())
+        if coerced > MAX_COERCED * max(series.notna().sum(), 1):
+            continue
+        df[col] = converted
+        report.append({
+            'Colonne': str(col),
+            'Type détecté': inference['kind'],
+            'Format': inference['format'],
+            'Valeurs non converties': coerced,
+        })
+    return df, report
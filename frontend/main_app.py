@@ -1,18 +1,44 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-import io
+import functools
 import os
-import numpy as np
-from datetime import datetime
+import sys
+import uuid
 import warnings
 warnings.filterwarnings('ignore')
 
+# Accès au package backend depuis `streamlit run frontend/main_app.py`
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.cache import derive_key, get_shared_cache, set_session
+from backend.clustering import cluster_counts, clustering_key, perform_clustering, sweep_k
+from backend.correlation import METHODS as CORRELATION_METHODS, get_correlation
+from backend.cube import MAX_ITEMS as CUBE_MAX_ITEMS, STATISTICS as CUBE_STATISTICS, get_cube
+from backend.data_loader import load_data, load_lazy
+from backend.export import (
+    FORMATS as EXPORT_FORMATS, available_formats, estimate_excel, find_export, get_excel, get_export,
+    read_export,
+)
+from backend.filters import FilteredView, get_filter_engine, is_range_column
+from backend.forecasting import FREQUENCIES, get_forecast, time_series_forecast
+from backend.pipeline import build_report, clean_dataset, generate_insights
+from backend.perf import count_rows, get_recorder, stage
+from backend.synthetic import generate_dataset
+from backend.jobs import (
+    CANCELLED as JOB_CANCELLED, DONE as JOB_DONE, FAILED as JOB_FAILED, JobQueueFull, get_job_manager
+)
+from backend.data_analysis import (
+    detect_anomalies, get_outlier_mask, get_profile, get_row_index, get_sketch
+)
+
 # Gestion des imports optionnels pour Plotly
 try:
     import plotly.express as px
     import plotly.graph_objects as go
     from plotly.subplots import make_subplots
+    from backend.charts import (
+        BIN_STRATEGIES, box_figure, forecast_figure, get_box, get_histogram, histogram_figure, scatter_figure
+    )
     PLOTLY_AVAILABLE = True
 except ImportError:
     PLOTLY_AVAILABLE = False
@@ -25,6 +51,11 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Session rattachée au cache partagé : les résultats qu'elle utilise ne sont pas évincés
+session_id = st.session_state.setdefault('session_id', uuid.uuid4().hex)
+set_session(session_id)
+get_recorder().begin_run(session_id)
+
 # --- Personnalisation du style avec couleurs douces ---
 st.markdown("""
 <style>
@@ -170,16 +201,41 @@ with st.sidebar:
         help="Importez votre fichier CSV ou Excel pour commencer l'analyse"
     )
     
+    streaming_load = st.checkbox(
+        "Chargement par blocs (gros fichiers)", value=False,
+        help="Lecture par blocs avec types compacts et plafond mémoire"
+    )
+    if streaming_load:
+        memory_limit_mb = st.number_input("Plafond mémoire (Mo)", min_value=50, max_value=32000,
+                                          value=1024, step=50)
+        chunk_rows = st.number_input("Lignes par bloc", min_value=10_000, max_value=2_000_000,
+                                     value=100_000, step=10_000)
+    
     # Nouveaux paramètres dans la sidebar
     st.markdown("### ⚙️ Paramètres d'analyse")
     
     analysis_mode = st.selectbox(
         "Mode d'analyse :",
-        ["Standard", "Avancé", "Expert"]
+        ["Standard", "Avancé", "Expert", "Approximatif"],
+        help="Approximatif : statistiques par esquisses (quantiles, distincts, top modalités) pour les très gros jeux"
     )
+    approximate_mode = analysis_mode == "Approximatif"
     
     auto_clean = st.checkbox("Nettoyage automatique des données", value=True)
+    detect_types = st.checkbox(
+        "Détection automatique des types", value=True,
+        help="Dates, nombres et booléens stockés en texte, détectés sur un échantillon puis convertis une fois"
+    )
+    encode_text = st.checkbox(
+        "Encodage catégoriel des colonnes texte", value=True,
+        help="Convertit les textes en catégories (ou chaînes Arrow) pour accélérer filtres, graphiques et tableaux croisés"
+    )
     detect_outliers = st.checkbox("Détection automatique des valeurs aberrantes", value=True)
+    point_budget = st.number_input(
+        "Budget de points par graphique", min_value=1_000, max_value=1_000_000,
+        value=50_000, step=5_000,
+        help="Au-delà, les courbes sont réduites (LTTB) et les nuages agrégés en densité"
+    )
     
     st.markdown("---")
     st.markdown("### 🎯 Modules activés")
@@ -188,105 +244,680 @@ with st.sidebar:
     forecasting_enabled = st.checkbox("Prévisions temporelles", value=True)
     clustering_enabled = st.checkbox("Clustering", value=True)
 
-# --- Fonctions des nouvelles fonctionnalités ---
-def detect_anomalies(df, numerical_columns):
-    """Détection des valeurs aberrantes"""
-    anomalies = {}
-    for col in numerical_columns:
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
-        IQR = Q3 - Q1
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
-        
-        outliers = df[(df[col] < lower_bound) | (df[col] > upper_bound)]
-        anomalies[col] = {
-            'count': len(outliers),
-            'percentage': (len(outliers) / len(df)) * 100,
-            'outliers': outliers[col].tolist()
-        }
-    return anomalies
-
-def generate_insights(df):
-    """Génération automatique d'insights"""
-    insights = []
-    
-    # Insight sur les données manquantes
-    missing_percentage = (df.isnull().sum().sum() / (df.shape[0] * df.shape[1])) * 100
-    if missing_percentage > 10:
-        insights.append(f"⚠️ **Données manquantes** : {missing_percentage:.1f}% des valeurs sont manquantes")
-    
-    # Insight sur les doublons
-    duplicates = df.duplicated().sum()
-    if duplicates > 0:
-        insights.append(f"🔍 **Doublons** : {duplicates} lignes dupliquées détectées")
-    
-    # Insight sur les colonnes numériques
-    numeric_cols = df.select_dtypes(include=np.number).columns
-    if len(numeric_cols) > 0:
-        high_variance_cols = []
-        for col in numeric_cols:
-            if df[col].std() / df[col].mean() > 2:  # Coefficient de variation élevé
-                high_variance_cols.append(col)
-        if high_variance_cols:
-            insights.append(f"📊 **Variance élevée** : {', '.join(high_variance_cols[:3])}")
-    
-    return insights
-
-def perform_clustering(df, numerical_columns, n_clusters=3):
-    """Clustering K-means simple"""
-    from sklearn.cluster import KMeans
-    from sklearn.preprocessing import StandardScaler
-    
-    # Préparation des données
-    X = df[numerical_columns].dropna()
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    
-    # Clustering
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-    clusters = kmeans.fit_predict(X_scaled)
-    
-    return clusters, kmeans
-
-def time_series_forecast(df, date_column, value_column):
-    """Prévisions temporelles simples"""
+# --- Tâches de fond ---
+def submit_job(slot, scope, key, func, *args, label="", is_valid=None):
+    """Soumet une tâche au pool partagé et mémorise son identifiant dans la session"""
     try:
-        # Vérifier si c'est une série temporelle
-        if date_column in df.columns and value_column in df.columns:
-            ts_data = df[[date_column, value_column]].copy()
-            ts_data[date_column] = pd.to_datetime(ts_data[date_column], errors='coerce')
-            ts_data = ts_data.dropna()
-            ts_data = ts_data.set_index(date_column).sort_index()
-            
-            # Statistiques de base
-            stats = {
-                'trend': 'positive' if ts_data[value_column].diff().mean() > 0 else 'negative',
-                'volatility': ts_data[value_column].std(),
-                'last_value': ts_data[value_column].iloc[-1],
-                'growth_rate': ((ts_data[value_column].iloc[-1] - ts_data[value_column].iloc[0]) / ts_data[value_column].iloc[0]) * 100
+        job = get_job_manager().submit(key, func, *args, label=label, is_valid=is_valid)
+    except JobQueueFull as e:
+        st.warning(f"⏳ {e}")
+        return
+    st.session_state.setdefault('jobs', {})[slot] = {'id': job.id, 'scope': scope}
+
+def track_job(slot, scope, resolve=None):
+    """Statut de la tâche de la session : progression et annulation, résultat une fois terminée.
+
+    `resolve` transforme le résultat (clé de cache, chemin) ; None s'il n'est plus disponible.
+    """
+    entry = st.session_state.get('jobs', {}).get(slot)
+    if entry is None or entry['scope'] != scope:
+        return None
+    job = get_job_manager().get(entry['id'])
+    if job is None:
+        return None
+    if job.status == JOB_DONE:
+        result = job.result if resolve is None else resolve(job.result)
+        if result is None:
+            st.info(f"{job.label} : résultat expiré, relancez le calcul")
+            del st.session_state['jobs'][slot]
+        return result
+    if job.status == JOB_FAILED:
+        st.error(f"Erreur ({job.label}) : {job.error}")
+    elif job.status == JOB_CANCELLED:
+        st.warning(f"{job.label} : tâche annulée")
+    else:
+        job_status(slot, job.id)
+    return None
+
+# Intervalle de rafraîchissement du statut d'une tâche en cours
+JOB_POLL_SECONDS = float(os.environ.get("HEVITRA_JOB_POLL", "1"))
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def job_status(slot, job_id):
+    """Progression rafraîchie seule tant que la tâche tourne ; à la fin, une réexécution
+    complète affiche le résultat et retire ce fragment (fin du rafraîchissement)"""
+    job = get_job_manager().get(job_id)
+    if job is None or job.finished:
+        st.rerun()
+    st.progress(job.progress, text=f"{job.label} — {job.message} ({job.elapsed:.0f} s)")
+    if st.button("✖ Annuler", key=f"cancel_{slot}"):
+        get_job_manager().cancel(job.id)
+        st.rerun()
+
+def in_shared_cache(key):
+    return key in get_shared_cache()
+
+def existing_file(path):
+    return path if path is not None and os.path.exists(path) else None
+
+# Résultats volumineux laissés dans le cache partagé (mémoire comptabilisée) : les tâches renvoient leur clé
+def clustering_job(job, data, numerical_columns, n_clusters, data_key):
+    # Scaler et modèle mis en cache par (jeu de données, colonnes, k)
+    perform_clustering(data, numerical_columns, n_clusters, fingerprint=data_key,
+                       progress_callback=lambda f: job.report(f, "Ajustement et affectation des lignes"))
+    return clustering_key(data_key, numerical_columns, n_clusters)
+
+def clustering_result(key):
+    """Résultat de clustering lu dans le cache partagé ; None s'il a été évincé"""
+    cached = get_shared_cache().get(key)
+    if cached is None:
+        return None
+    _, fingerprint, columns, n_clusters = key
+    return {
+        'cache_key': key, 'key': fingerprint, 'columns': list(columns), 'k': n_clusters,
+        'labels': cached['labels'], 'method': cached['method'], 'fit_rows': cached['fit_rows'],
+    }
+
+def sweep_job(job, data, numerical_columns, data_key):
+    job.report(0.0, "Ajustements k = 2..10")
+    # Ajustements en parallèle ; les modèles sont réutilisés ensuite par le clustering
+    sweep, recommended, elbow = sweep_k(data, numerical_columns, fingerprint=data_key,
+                                        progress_callback=lambda f: job.report(f, "Ajustements k = 2..10"))
+    key = ('k_sweep', data_key, tuple(numerical_columns))
+    get_shared_cache().put(key, {
+        'key': (data_key, tuple(numerical_columns)), 'table': sweep,
+        'recommended': recommended, 'elbow': elbow,
+    })
+    return key
+
+def export_job(job, view, data_key, fmt):
+    return get_export(view, data_key, fmt, progress_callback=job.report)
+
+def excel_job(job, sources, data_key, view_key, variant):
+    return get_excel(sources, data_key, view_key, variant, progress_callback=job.report)
+
+def report_job(job, file_name, profile, insights):
+    job.report(0.5, "Rédaction du rapport")
+    return build_report(file_name, profile, insights)
+
+def restore_view(saved_view):
+    """Rétablit les filtres d'une vue sauvegardée (rappel exécuté avant la création des widgets)"""
+    st.session_state['filter_cols'] = saved_view['columns']
+    for kind, col, *values in saved_view['predicates']:
+        if kind == 'isin':
+            st.session_state[f"cat_{col}"] = list(values[0])
+        else:
+            st.session_state[f"num_{col}"] = tuple(values)
+
+# --- Sections réexécutables seules ---
+def section(label):
+    """Section en fragment : une interaction dans la section ne réexécute qu'elle.
+
+    Les entrées sont passées explicitement (celles de la dernière exécution complète) ;
+    les calculs restent servis par le cache partagé, rattaché à la session.
+    Chaque exécution est mesurée sous `label` (lignes lues sur le premier argument).
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            set_session(session_id, new_run=False)
+            get_recorder().begin_run(session_id, new_run=False)
+            with stage(label, count_rows(args[0]) if args else None):
+                return func(*args, **kwargs)
+        return st.fragment(run)
+    return decorate
+
+# --- Aperçu des données ---
+@section("Exploration")
+def exploration_section(data, data_key, profile, sketch, new_rows_count):
+    st.markdown('<div class="modern-card">', unsafe_allow_html=True)
+    st.markdown('<div class="card-title">📋 Exploration des Données</div>', unsafe_allow_html=True)
+    
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["🔍 Données brutes", "📊 Structure", "📈 Statistiques", "🎯 Qualité", "🔍 Types de données"])
+    
+    with tab1:
+        st.dataframe(data.head(10), use_container_width=True)
+        st.write(f"**Dimensions** : {data.shape[0]} lignes × {data.shape[1]} colonnes")
+    
+    with tab2:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("**Types de données :**")
+            for dtype, count in profile.dtype_counts.items():
+                st.write(f"- {dtype} : {count} colonnes")
+        with col2:
+            st.write("**Valeurs manquantes :**")
+            st.dataframe(profile.missing_table, use_container_width=True)
+    
+    with tab3:
+        st.write("**Statistiques descriptives :**")
+        if approximate_mode:
+            st.caption("Mode approximatif : quantiles KLL, distincts HyperLogLog, modalités Space-Saving")
+            st.dataframe(sketch.describe().astype(str), use_container_width=True)
+        else:
+            st.dataframe(profile.describe().astype(str), use_container_width=True)
+    
+    with tab4:
+        col1, col2 = st.columns(2)
+        with col1:
+            # Qualité des données
+            st.write("**Indicateurs de qualité :**")
+            quality_metrics = {
+                'Complétude': f"{(100 - profile.missing_percentage):.1f}%",
+                'Unicité': f"{((profile.n_rows - profile.duplicate_count) / profile.n_rows * 100):.1f}%",
+                'Consistance': "À analyser",
+                'Précision': "À valider"
             }
-            return stats, ts_data
-    except:
-        return None, None
+            for metric, value in quality_metrics.items():
+                st.write(f"- **{metric}** : {value}")
+        
+        with col2:
+            st.write("**Alertes de qualité :**")
+            if profile.total_missing > 0:
+                st.error("❌ Données manquantes détectées")
+            if profile.duplicate_count > 0:
+                st.warning("⚠️ Doublons détectés")
+            if not profile.numeric_columns:
+                st.info("ℹ️ Aucune colonne numérique détectée")
+            if new_rows_count is not None:
+                st.info(f"🆕 {new_rows_count:,} nouvelles lignes par rapport à l'import précédent")
+        
+        dup_subset = st.multiselect("Vérifier les doublons sur les colonnes :", data.columns.tolist(),
+                                    key="dup_subset")
+        if dup_subset:
+            subset_duplicates = get_row_index(data, data_key, dup_subset).duplicate_count
+            st.write(f"**{subset_duplicates:,} doublons** sur {', '.join(map(str, dup_subset))}")
+    
+    with tab5:
+        # Analyse par type de données
+        numeric_cols = profile.numeric_columns
+        categorical_cols = profile.categorical_columns
+        date_cols = profile.datetime_columns
+        
+        st.write(f"**{len(numeric_cols)} colonnes numériques** : {numeric_cols}")
+        st.write(f"**{len(categorical_cols)} colonnes catégorielles** : {categorical_cols}")
+        if date_cols:
+            st.write(f"**{len(date_cols)} colonnes temporelles** : {date_cols}")
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# --- Détection des valeurs aberrantes ---
+@section("Valeurs aberrantes")
+def outliers_section(data, data_key, profile, sketch):
+    st.markdown('<div class="modern-card">', unsafe_allow_html=True)
+    st.markdown('<div class="card-title">🚨 Détection des Valeurs Aberrantes</div>', unsafe_allow_html=True)
+    
+    numerical_columns = profile.numeric_columns
+    outlier_mask = get_outlier_mask(data, data_key, numerical_columns, sketch)
+    anomalies = detect_anomalies(data, numerical_columns, outlier_mask)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("**Résumé des anomalies :**")
+        if approximate_mode and numerical_columns[0] in sketch.quantiles:
+            rank_error = sketch.quantiles[numerical_columns[0]].rank_error
+            st.caption(f"Bornes IQR approchées (erreur de rang ±{rank_error:.1%})")
+        for col, info in anomalies.items():
+            if info['count'] > 0:
+                st.write(f"- **{col}** : {info['count']} anomalies ({info['percentage']:.1f}%)")
+    
+    with col2:
+        # Options de traitement
+        st.write("**Traitement des anomalies :**")
+        handle_outliers = st.selectbox(
+            "Action sur les anomalies :",
+            ["Aucune", "Marquer", "Supprimer", "Remplacer par médiane"]
+        )
+        
+        if st.button("Appliquer le traitement") and handle_outliers != "Aucune":
+            # Traitement mémorisé : l'exécution complète l'applique avant les sections suivantes
+            st.session_state['outlier_treatment'] = {'key': data_key, 'action': handle_outliers}
+            st.rerun()
+        treatment = st.session_state.get('outlier_treatment')
+        if treatment is not None and treatment['key'] == data_key:
+            st.success(f"Traitement « {treatment['action']} » appliqué avec succès")
+            if st.button("↩️ Annuler le traitement"):
+                del st.session_state['outlier_treatment']
+                st.rerun()
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+def treat_outliers(data, data_key, numerical_columns, sketch, action):
+    """Jeu de données traité, partagé entre sessions par (jeu de données, action)"""
+    treated_key = derive_key(data_key, 'outliers', action)
+    outlier_mask = get_outlier_mask(data, data_key, numerical_columns, sketch)
+    treated = get_shared_cache().get_or_compute(('frame', treated_key), lambda: outlier_mask.apply(data, action))
+    return treated, treated_key
+
+# --- Machine Learning & Clustering ---
+def session_clustering(data_key):
+    """Résultat de clustering de la session, tant que le jeu de données ne change pas"""
+    clustering = st.session_state.get('clustering')
+    if clustering is not None and clustering['key'] != data_key:
+        clustering = None
+        get_shared_cache().hold(session_id, 'clustering', None)
+    return clustering
+
+@section("Clustering")
+def clustering_section(data, data_key, profile):
+    clustering = session_clustering(data_key)
+    st.markdown('<div class="modern-card">', unsafe_allow_html=True)
+    st.markdown('<div class="card-title">🤖 Machine Learning - Clustering</div>', unsafe_allow_html=True)
+
+    numerical_columns = st.multiselect(
+        "Sélectionnez les colonnes pour le clustering :",
+        profile.numeric_columns,
+        default=profile.numeric_columns[:2]
+    )
+
+    if len(numerical_columns) >= 2:
+        st.session_state.setdefault('n_clusters', 3)
+        col_k, col_auto = st.columns([3, 1])
+        with col_auto:
+            if st.button("⚡ Auto-k (2 à 10)"):
+                submit_job('k_sweep', data_key, ('k_sweep', data_key, tuple(numerical_columns)),
+                           sweep_job, data, numerical_columns, data_key, label="Balayage de k",
+                           is_valid=in_shared_cache)
+            sweep_result = track_job('k_sweep', data_key, resolve=get_shared_cache().get)
+            # k recommandé appliqué une seule fois, avant la création du curseur
+            if sweep_result is not None and st.session_state.get('k_sweep') is not sweep_result:
+                st.session_state['k_sweep'] = sweep_result
+                st.session_state['n_clusters'] = sweep_result['recommended']
+        with col_k:
+            n_clusters = st.slider("Nombre de clusters :", 2, 10, key='n_clusters')
+
+        k_sweep = st.session_state.get('k_sweep')
+        if k_sweep is not None and k_sweep['key'] == (data_key, tuple(numerical_columns)):
+            st.write(f"**k recommandé : {k_sweep['recommended']}** (meilleure silhouette) • "
+                     f"coude de l'inertie : {k_sweep['elbow']}")
+            if PLOTLY_AVAILABLE:
+                sweep = k_sweep['table']
+                fig = make_subplots(specs=[[{"secondary_y": True}]])
+                fig.add_trace(go.Scatter(x=sweep['k'], y=sweep['inertie'], mode='lines+markers',
+                                         name='Inertie', line=dict(color='#3498db')))
+                fig.add_trace(go.Scatter(x=sweep['k'], y=sweep['silhouette'], mode='lines+markers',
+                                         name='Silhouette', line=dict(color='#e74c3c')),
+                              secondary_y=True)
+                fig.add_vline(x=k_sweep['recommended'], line_dash='dash', line_color='#2ecc71')
+                fig.update_layout(title="Méthode du coude et score de silhouette",
+                                  plot_bgcolor='white', paper_bgcolor='white')
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.dataframe(k_sweep['table'], use_container_width=True)
+
+        if st.button("🔍 Exécuter le Clustering"):
+            submit_job('clustering', data_key,
+                       ('clustering', data_key, tuple(numerical_columns), n_clusters),
+                       clustering_job, data, numerical_columns, n_clusters, data_key,
+                       label="Clustering", is_valid=in_shared_cache)
+        # Un rerun reprend le résultat terminé au lieu de relancer le calcul
+        result = track_job('clustering', data_key, resolve=clustering_result)
+        if result is not None and (clustering is None or clustering['cache_key'] != result['cache_key']):
+            clustering = st.session_state['clustering'] = result
+            # Étiquettes partagées : l'entrée du cache reste référencée par la session
+            get_shared_cache().hold(session_id, 'clustering', result['cache_key'])
+            st.success("Clustering terminé avec succès !")
+
+        if clustering is not None:
+            labels = clustering['labels']
+            method_names = {'kmeans': "K-means", 'minibatch': "MiniBatch K-means",
+                            'sample': "MiniBatch K-means sur échantillon"}
+            st.caption(f"{method_names[clustering['method']]} • k = {clustering['k']} • "
+                       f"{clustering['fit_rows']:,} lignes d'apprentissage")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.write("**Répartition des clusters :**")
+                for cluster, count in cluster_counts(labels).items():
+                    st.write(f"Cluster {cluster} : {count} éléments ({count/len(data)*100:.1f}%)")
+                unassigned = int((labels < 0).sum())
+                if unassigned:
+                    st.write(f"Non affectées (valeurs manquantes) : {unassigned}")
+
+            with col2:
+                if PLOTLY_AVAILABLE:
+                    x_col, y_col = clustering['columns'][:2]
+                    assigned = labels >= 0
+                    # Seules les deux colonnes tracées sont copiées, pas le jeu complet
+                    fig, sampling_info = scatter_figure(
+                        data.loc[assigned, [x_col, y_col]], x_col, y_col,
+                        title="Visualisation des Clusters", color=labels[assigned],
+                        point_budget=point_budget
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+                    st.caption(sampling_info)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# --- Analyse temporelle ---
+@section("Analyse temporelle")
+def time_series_section(data, data_key, profile):
+    date_columns = profile.datetime_columns
+    st.markdown('<div class="modern-card">', unsafe_allow_html=True)
+    st.markdown('<div class="card-title">📈 Analyse Temporelle</div>', unsafe_allow_html=True)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        date_col = st.selectbox("Colonne de date :", date_columns)
+    with col2:
+        value_col = st.selectbox("Colonne de valeurs :", profile.numeric_columns)
+    with col3:
+        group_col = st.selectbox("Une série par :", ["Aucun"] + profile.categorical_columns)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        freq_labels = {'Auto': "Automatique", 'min': "Minute", 'h': "Heure", 'D': "Jour",
+                       'W': "Semaine", 'MS': "Mois", 'QS': "Trimestre", 'YS': "Année"}
+        freq = st.selectbox("Fréquence :", ['Auto'] + list(FREQUENCIES), format_func=freq_labels.get)
+    with col2:
+        horizon = st.number_input("Horizon (périodes) :", min_value=1, max_value=365, value=12)
+    with col3:
+        season_length = st.number_input("Saisonnalité (périodes) :", min_value=1, max_value=365, value=1,
+                                        help="1 : pas de composante saisonnière (Holt)")
+
+    if date_col and value_col:
+        try:
+            # Dates analysées et triées une fois par (jeu de données, colonne)
+            stats, ts_data = time_series_forecast(data, date_col, value_col, fingerprint=data_key)
+            st.write("**Analyse de la série temporelle :**")
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Tendance", stats['trend'])
+            with col2:
+                st.metric("Volatilité", f"{stats['volatility']:.2f}")
+            with col3:
+                st.metric("Dernière valeur", f"{stats['last_value']:.2f}")
+            with col4:
+                st.metric("Taux croissance", f"{stats['growth_rate']:.1f}%")
+
+            # Toutes les séries (une par groupe le cas échéant) ajustées en une seule passe
+            result = get_forecast(data, data_key, date_col, [value_col],
+                                  freq=None if freq == 'Auto' else freq,
+                                  group_column=None if group_col == "Aucun" else group_col,
+                                  horizon=int(horizon), season_length=int(season_length))
+            history = result['history']
+            st.caption(f"Holt-Winters additif • fréquence : {freq_labels[result['freq']]} • "
+                       f"{history.shape[1]} série(s) • intervalle à 95 %")
+            series = history.columns[0]
+            if history.shape[1] > 1:
+                series = st.selectbox("Série affichée :", history.columns.tolist())
+
+            if PLOTLY_AVAILABLE:
+                fig, sampling_info = forecast_figure(
+                    history[series], result['forecast'][series], result['lower'][series],
+                    result['upper'][series], title=f"Évolution et prévision de {value_col}",
+                    point_budget=point_budget
+                )
+                st.plotly_chart(fig, use_container_width=True)
+                st.caption(sampling_info)
+            with st.expander("Paramètres et prévisions par série"):
+                st.dataframe(result['params'], use_container_width=True)
+                st.dataframe(result['forecast'], use_container_width=True)
+        except ValueError as e:
+            st.warning(f"Prévision impossible : {e}")
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# --- Visualisations interactives avancées ---
+@section("Graphiques")
+def charts_section(filtered_view, data_key, profile, sketch):
+    viz_col1, viz_col2 = st.columns([1, 2])
+
+    with viz_col1:
+        plot_type = st.selectbox("Type de visualisation :", 
+                               ["Histogramme", "Boxplot", "Scatter Plot", "Line Chart", "Bar Chart", "Pie Chart", "Heatmap"])
+
+        numeric_cols = profile.numeric_columns
+        cat_cols = profile.categorical_columns
+
+        if plot_type in ["Histogramme", "Boxplot"] and numeric_cols:
+            selected_col = st.selectbox("Colonne numérique :", numeric_cols)
+            if plot_type == "Histogramme":
+                bin_strategy = st.selectbox("Découpage des classes :", BIN_STRATEGIES)
+        elif plot_type == "Scatter Plot" and len(numeric_cols) >= 2:
+            x_col = st.selectbox("Axe X :", numeric_cols)
+            y_col = st.selectbox("Axe Y :", [c for c in numeric_cols if c != x_col])
+        elif plot_type == "Pie Chart" and cat_cols:
+            selected_col = st.selectbox("Colonne catégorielle :", cat_cols)
+        elif plot_type == "Heatmap" and len(numeric_cols) >= 2:
+            corr_method = st.selectbox("Méthode :", CORRELATION_METHODS, format_func=str.capitalize)
+            heatmap_columns = st.slider("Colonnes affichées (max) :", 2, 200,
+                                        min(len(numeric_cols), 50))
+            top_k = st.number_input("Paires les plus corrélées :", min_value=5, max_value=500,
+                                    value=20, step=5)
+
+    with viz_col2:
+        try:
+            soft_colors = ['#3498db', '#2ecc71', '#e74c3c', '#f39c12', '#9b59b6', '#1abc9c']
+
+            # Construction du graphique mesurée par type (calcul et figure)
+            with stage(f"Graphique : {plot_type}", filtered_view.n_rows):
+                if plot_type == "Histogramme" and numeric_cols:
+                    # Classes calculées côté serveur : seuls les comptes sont envoyés au navigateur
+                    counts, edges = get_histogram(filtered_view, data_key, selected_col, bin_strategy)
+                    fig = histogram_figure(counts, edges, selected_col,
+                                           title=f"Distribution de {selected_col}",
+                                           color='#3498db')
+                    fig.update_layout(plot_bgcolor='white', paper_bgcolor='white')
+                    st.plotly_chart(fig, use_container_width=True)
+
+                elif plot_type == "Boxplot" and numeric_cols:
+                    box_stats = get_box(filtered_view, data_key, selected_col)
+                    if box_stats is None:
+                        st.info("Aucune valeur numérique à afficher")
+                    else:
+                        fig = box_figure(box_stats, selected_col,
+                                         title=f"Boxplot de {selected_col}",
+                                         color='#2ecc71')
+                        fig.update_layout(plot_bgcolor='white', paper_bgcolor='white')
+                        st.plotly_chart(fig, use_container_width=True)
+                        if box_stats['n_outliers'] > len(box_stats['outliers']):
+                            st.caption(f"{len(box_stats['outliers']):,} valeurs aberrantes affichées "
+                                       f"sur {box_stats['n_outliers']:,}")
+
+                elif plot_type == "Scatter Plot" and len(numeric_cols) >= 2:
+                    fig, sampling_info = scatter_figure(filtered_view.frame([x_col, y_col]), x_col, y_col,
+                                                        title=f"{x_col} vs {y_col}",
+                                                        point_budget=point_budget,
+                                                        color_discrete_sequence=['#e74c3c'])
+                    fig.update_layout(plot_bgcolor='white', paper_bgcolor='white')
+                    st.plotly_chart(fig, use_container_width=True)
+                    st.caption(sampling_info)
+
+                elif plot_type == "Pie Chart" and cat_cols:
+                    if approximate_mode and filtered_view.rows is None and selected_col in sketch.top:
+                        # Sans filtre, les comptes viennent de l'esquisse top-k
+                        pie_data = sketch.top[selected_col].top(10)
+                        st.caption(f"Comptes approchés (±{sketch.top[selected_col].error})")
+                    else:
+                        pie_data = filtered_view.value_counts(selected_col).head(10)
+                    fig = px.pie(values=pie_data.values, names=pie_data.index,
+                               title=f"Répartition de {selected_col}",
+                               color_discrete_sequence=soft_colors)
+                    fig.update_layout(plot_bgcolor='white', paper_bgcolor='white')
+                    st.plotly_chart(fig, use_container_width=True)
+
+                elif plot_type == "Heatmap" and len(numeric_cols) >= 2:
+                    # Calcul par blocs float32, mis en cache par (vue filtrée, méthode)
+                    correlation_result = get_correlation(filtered_view, data_key, numeric_cols, corr_method)
+                    corr_matrix = correlation_result.heatmap(heatmap_columns)
+                    fig = px.imshow(corr_matrix, 
+                                  title="Matrice de corrélations",
+                                  color_continuous_scale='RdBu_r',
+                                  zmin=-1, zmax=1,
+                                  aspect='auto')
+                    st.plotly_chart(fig, use_container_width=True)
+                    if len(corr_matrix) < len(numeric_cols):
+                        st.caption(f"{len(corr_matrix)} colonnes les plus corrélées sur {len(numeric_cols)}, "
+                                   f"regroupées par similarité")
+                    st.write("**Paires les plus corrélées :**")
+                    st.dataframe(correlation_result.top_pairs(int(top_k)), use_container_width=True)
+
+        except Exception as e:
+            st.warning(f"Impossible de générer la visualisation : {e}")
+
+@section("Tableau croisé")
+def pivot_section(filtered_view, data_key, profile):
+    numeric_cols = profile.numeric_columns
+    cat_cols = profile.categorical_columns
+    st.write("**Tableaux croisés dynamiques**")
+    if len(cat_cols) >= 2:
+        pivot_col1, pivot_col2, pivot_col3 = st.columns(3)
+        with pivot_col1:
+            row_col = st.selectbox("Lignes :", cat_cols)
+        with pivot_col2:
+            col_col = st.selectbox("Colonnes :", ["Aucune"] + [c for c in cat_cols if c != row_col])
+        with pivot_col3:
+            drill_col = st.selectbox("Détailler par :", ["Aucun"] + [c for c in cat_cols
+                                                                   if c not in (row_col, col_col)])
+        pivot_col1, pivot_col2, pivot_col3 = st.columns(3)
+        with pivot_col1:
+            value_cols = st.multiselect("Valeurs :", numeric_cols, default=numeric_cols[:1])
+        with pivot_col2:
+            stat_labels = {'mean': "Moyenne", 'sum': "Somme", 'count': "Nombre",
+                           'min': "Minimum", 'max': "Maximum"}
+            pivot_stats = st.multiselect("Agrégations :", CUBE_STATISTICS, default=['mean'],
+                                         format_func=stat_labels.get)
+        with pivot_col3:
+            max_items = st.number_input("Modalités max par axe :", min_value=5, max_value=500,
+                                        value=CUBE_MAX_ITEMS, step=5)
+        show_totals = st.checkbox("Sous-totaux", value=True)
+
+        columns_dim = None if col_col == "Aucune" else col_col
+        drill_dim = None if drill_col == "Aucun" else drill_col
+        # Agrégats calculés une fois par (vue, dimensions, valeurs) ; re-pivots et détails sans relecture
+        cube = get_cube(filtered_view, data_key, [row_col, columns_dim, drill_dim], value_cols)
+        filters = None
+        pivot_rows = row_col
+        if drill_dim:
+            drill_value = st.selectbox(f"Valeur de « {row_col} » à détailler :",
+                                       cube.rollup([row_col]).index.tolist())
+            filters, pivot_rows = {row_col: drill_value}, drill_dim
+        pivot_table, hidden_rows, hidden_cols = cube.pivot(
+            pivot_rows, columns_dim, value_cols, pivot_stats or ['mean'], filters=filters,
+            margins=show_totals, max_items=int(max_items)
+        )
+        st.dataframe(pivot_table, use_container_width=True)
+        if hidden_rows or hidden_cols:
+            st.caption(f"Affichage limité aux {int(max_items)} modalités les plus fréquentes : "
+                       f"{hidden_rows} ligne(s) et {hidden_cols} colonne(s) masquées "
+                       f"(incluses dans les totaux)")
+
+# --- Export et reporting avancé ---
+@section("Export")
+def export_section(data, data_key, filtered_view, profile, insights, file_name):
+    clustering = session_clustering(data_key)
+    st.markdown('<div class="modern-card">', unsafe_allow_html=True)
+    st.markdown('<div class="card-title">💾 Export & Reporting Avancé</div>', unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.write("**Export des données :**")
+        export_format = st.selectbox("Format :", available_formats(),
+                                     format_func=lambda fmt: EXPORT_FORMATS[fmt][0])
+        export_label, export_extension, export_mime = EXPORT_FORMATS[export_format]
+        # Généré uniquement à la demande ; fichier réutilisé pour (données, filtres, format)
+        export_file = find_export(data_key, filtered_view.key, export_format)
+        export_scope = (data_key, filtered_view.key, export_format)
+        if export_file is None:
+            if st.button(f"⚙️ Préparer l'export {export_label}"):
+                submit_job('export', export_scope, ('export',) + export_scope, export_job,
+                           filtered_view, data_key, export_format, label=f"Export {export_label}",
+                           is_valid=existing_file)
+            export_file = track_job('export', export_scope, resolve=existing_file)
+        if export_file is not None:
+            # Fichier lu au clic seulement, pas à chaque exécution du script
+            st.download_button(f"📥 Télécharger {export_label}",
+                             data=functools.partial(read_export, export_file),
+                             file_name="donnees_analysees" + export_extension,
+                             mime=export_mime)
+    
+    with col2:
+        st.write("**Export Excel :**")
+        excel_sources = [('Données', filtered_view, None)]
+        excel_variant = None
+        if clustering is not None:
+            excel_sources.append(('Avec_Clusters', FilteredView(data), clustering['labels']))
+            excel_variant = (clustering['k'], tuple(clustering['columns']))
+        excel_scope = (data_key, filtered_view.key, excel_variant)
+        excel_file = find_export(data_key, filtered_view.key, 'xlsx', excel_variant)
+        if excel_file is None:
+            size, duration, sheets = estimate_excel(excel_sources)
+            st.caption(f"Estimation : ≈ {size / 1024 ** 2:.1f} Mo, ≈ {duration:.0f} s, {sheets} feuille(s)")
+            if st.button("⚙️ Préparer l'export Excel"):
+                submit_job('excel', excel_scope, ('excel',) + excel_scope, excel_job,
+                           excel_sources, data_key, filtered_view.key, excel_variant, label="Export Excel",
+                           is_valid=existing_file)
+            excel_file = track_job('excel', excel_scope, resolve=existing_file)
+        if excel_file is not None:
+            st.download_button("📥 Télécharger Excel",
+                             data=functools.partial(read_export, excel_file),
+                             file_name="analyse_complete.xlsx",
+                             mime=EXPORT_FORMATS['xlsx'][2])
+    
+    with col3:
+        st.write("**Rapport d'analyse :**")
+        if st.button("📄 Générer le rapport"):
+            submit_job('report', data_key, ('report', data_key, file_name), report_job,
+                       file_name, profile, insights, label="Rapport")
+        report = track_job('report', data_key)
+        if report is not None:
+            st.text_area("Rapport généré :", report, height=300)
+            st.download_button("📥 Télécharger le rapport",
+                             data=report,
+                             file_name="rapport_analyse.txt",
+                             mime="text/plain")
+    
+    st.markdown('</div>', unsafe_allow_html=True)
 
 # --- Contenu principal ---
 if uploaded_file is not None:
     try:
-        if uploaded_file.name.endswith(".csv"):
-            data = pd.read_csv(uploaded_file)
-        else:
-            data = pd.read_excel(uploaded_file)
+        # Lecture mise en cache par empreinte du contenu : pas de re-parsing à chaque interaction
+        streaming = None
+        if streaming_load:
+            streaming = {'chunksize': int(chunk_rows), 'memory_limit_mb': int(memory_limit_mb)}
+        with stage("Chargement") as record:
+            # CSV larges : schéma immédiat puis lecture des seules colonnes sélectionnées
+            loaded = load_lazy(uploaded_file, encode=encode_text, detect_types=detect_types) \
+                if streaming is None else None
+            if loaded is None:
+                loaded = load_data(uploaded_file, streaming=streaming, build_sketch=approximate_mode,
+                                   encode=encode_text, detect_types=detect_types)
+            data_key, data = loaded
+            record.rows = count_rows(data)
+        if data is None:
+            st.stop()
+        
+        # Empreintes de lignes calculées une fois : doublons, nettoyage et comparaison d'imports
+        row_index = get_row_index(data, data_key)
+        
+        # Comparaison avec l'import précédent de la session (nouvelles lignes uniquement)
+        last_import = st.session_state.get('row_hashes')
+        if last_import is None or last_import['key'] != data_key:
+            st.session_state['previous_row_hashes'] = last_import['hashes'] if last_import else None
+            st.session_state['row_hashes'] = {'key': data_key, 'hashes': row_index.hash_set()}
+        previous_row_hashes = st.session_state['previous_row_hashes']
+        new_rows_count = int(row_index.new_rows(previous_row_hashes).sum()) if previous_row_hashes is not None else None
         
         # Nettoyage automatique si activé
         if auto_clean:
-            original_shape = data.shape
-            # Supprimer les colonnes vides
-            data = data.dropna(axis=1, how='all')
-            # Supprimer les doublons
-            data = data.drop_duplicates()
-            if original_shape != data.shape:
-                st.success(f"🧹 **Nettoyage automatique** : {original_shape[0]-data.shape[0]} doublons supprimés, {original_shape[1]-data.shape[1]} colonnes vides supprimées")
+            with st.sidebar:
+                dedup_subset = st.multiselect(
+                    "Colonnes clés pour les doublons :", data.columns.tolist(),
+                    help="Laisser vide pour comparer les lignes entières"
+                )
+            # Colonnes vides et doublons (empreintes de lignes) ; empreinte dérivée si les données changent
+            with stage("Nettoyage", len(data)):
+                data, data_key, row_index, removed_rows, removed_cols = clean_dataset(data, data_key, row_index,
+                                                                                    dedup_subset)
+            if removed_rows or removed_cols:
+                st.success(f"🧹 **Nettoyage automatique** : {removed_rows} doublons supprimés, {removed_cols} colonnes vides supprimées")
+        
+        # Profil calculé une seule fois par jeu de données, partagé par toutes les sections
+        with stage("Métriques", len(data)):
+            profile = get_profile(data, data_key)
+            # Esquisses fusionnables (construites pendant le chargement par blocs si possible)
+            sketch = get_sketch(data, data_key) if approximate_mode else None
         
         # --- Métriques principales étendues ---
         st.markdown('<div class="modern-card">', unsafe_allow_html=True)
@@ -309,8 +940,7 @@ if uploaded_file is not None:
             """, unsafe_allow_html=True)
         
         with col3:
-            missing_values = data.isnull().sum().sum()
-            missing_percentage = (missing_values / (data.shape[0] * data.shape[1])) * 100
+            missing_percentage = profile.missing_percentage
             st.markdown(f"""
             <div class="metric-card">
                 <div class="metric-value">{missing_percentage:.1f}%</div>
@@ -319,7 +949,7 @@ if uploaded_file is not None:
             """, unsafe_allow_html=True)
         
         with col4:
-            numeric_cols = len(data.select_dtypes(include='number').columns)
+            numeric_cols = len(profile.numeric_columns)
             st.markdown(f"""
             <div class="metric-card">
                 <div class="metric-value">{numeric_cols}</div>
@@ -328,7 +958,7 @@ if uploaded_file is not None:
             """, unsafe_allow_html=True)
         
         with col5:
-            categorical_cols = len(data.select_dtypes(include=['object', 'category']).columns)
+            categorical_cols = len(profile.categorical_columns)
             st.markdown(f"""
             <div class="metric-card">
                 <div class="metric-value">{categorical_cols}</div>
@@ -337,7 +967,7 @@ if uploaded_file is not None:
             """, unsafe_allow_html=True)
         
         with col6:
-            duplicates = data.duplicated().sum()
+            duplicates = profile.duplicate_count
             st.markdown(f"""
             <div class="metric-card">
                 <div class="metric-value">{duplicates}</div>
@@ -348,7 +978,12 @@ if uploaded_file is not None:
         st.markdown('</div>', unsafe_allow_html=True)
 
         # --- Insights automatiques ---
-        insights = generate_insights(data)
+        # Matrice partagée avec la heatmap (même clé de cache en l'absence de filtre)
+        with stage("Insights", len(data)):
+            correlation = None
+            if len(profile.numeric_columns) >= 2:
+                correlation = get_correlation(FilteredView(data), data_key, profile.numeric_columns)
+            insights = generate_insights(profile, correlation)
         if insights:
             st.markdown('<div class="modern-card">', unsafe_allow_html=True)
             st.markdown('<div class="card-title">🤖 Insights Automatiques</div>', unsafe_allow_html=True)
@@ -356,108 +991,16 @@ if uploaded_file is not None:
                 st.write(insight)
             st.markdown('</div>', unsafe_allow_html=True)
 
-        # --- Aperçu des données ---
-        st.markdown('<div class="modern-card">', unsafe_allow_html=True)
-        st.markdown('<div class="card-title">📋 Exploration des Données</div>', unsafe_allow_html=True)
-        
-        tab1, tab2, tab3, tab4, tab5 = st.tabs(["🔍 Données brutes", "📊 Structure", "📈 Statistiques", "🎯 Qualité", "🔍 Types de données"])
-        
-        with tab1:
-            st.dataframe(data.head(10), use_container_width=True)
-            st.write(f"**Dimensions** : {data.shape[0]} lignes × {data.shape[1]} colonnes")
-        
-        with tab2:
-            col1, col2 = st.columns(2)
-            with col1:
-                st.write("**Types de données :**")
-                type_counts = data.dtypes.value_counts()
-                for dtype, count in type_counts.items():
-                    st.write(f"- {dtype} : {count} colonnes")
-            with col2:
-                st.write("**Valeurs manquantes :**")
-                missing_df = pd.DataFrame({
-                    'Colonne': data.columns,
-                    'Valeurs manquantes': data.isnull().sum().values,
-                    'Pourcentage': (data.isnull().sum() / len(data) * 100).round(2)
-                })
-                st.dataframe(missing_df, use_container_width=True)
-        
-        with tab3:
-            st.write("**Statistiques descriptives :**")
-            st.dataframe(data.describe(include='all'), use_container_width=True)
-        
-        with tab4:
-            col1, col2 = st.columns(2)
-            with col1:
-                # Qualité des données
-                st.write("**Indicateurs de qualité :**")
-                total_cells = data.shape[0] * data.shape[1]
-                quality_metrics = {
-                    'Complétude': f"{((total_cells - data.isnull().sum().sum()) / total_cells * 100):.1f}%",
-                    'Unicité': f"{((data.shape[0] - data.duplicated().sum()) / data.shape[0] * 100):.1f}%",
-                    'Consistance': "À analyser",
-                    'Précision': "À valider"
-                }
-                for metric, value in quality_metrics.items():
-                    st.write(f"- **{metric}** : {value}")
-            
-            with col2:
-                st.write("**Alertes de qualité :**")
-                if data.isnull().sum().sum() > 0:
-                    st.error("❌ Données manquantes détectées")
-                if data.duplicated().sum() > 0:
-                    st.warning("⚠️ Doublons détectés")
-                if data.select_dtypes(include='number').empty:
-                    st.info("ℹ️ Aucune colonne numérique détectée")
-        
-        with tab5:
-            # Analyse par type de données
-            numeric_cols = data.select_dtypes(include='number').columns
-            categorical_cols = data.select_dtypes(include=['object', 'category']).columns
-            date_cols = [col for col in data.columns if 'date' in col.lower() or 'time' in col.lower()]
-            
-            st.write(f"**{len(numeric_cols)} colonnes numériques** : {list(numeric_cols)}")
-            st.write(f"**{len(categorical_cols)} colonnes catégorielles** : {list(categorical_cols)}")
-            if date_cols:
-                st.write(f"**{len(date_cols)} colonnes temporelles** : {date_cols}")
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+        exploration_section(data, data_key, profile, sketch, new_rows_count)
 
-        # --- Détection des valeurs aberrantes ---
-        if detect_outliers and len(data.select_dtypes(include='number').columns) > 0:
-            st.markdown('<div class="modern-card">', unsafe_allow_html=True)
-            st.markdown('<div class="card-title">🚨 Détection des Valeurs Aberrantes</div>', unsafe_allow_html=True)
-            
-            numerical_columns = data.select_dtypes(include='number').columns.tolist()
-            anomalies = detect_anomalies(data, numerical_columns)
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                st.write("**Résumé des anomalies :**")
-                for col, info in anomalies.items():
-                    if info['count'] > 0:
-                        st.write(f"- **{col}** : {info['count']} anomalies ({info['percentage']:.1f}%)")
-            
-            with col2:
-                # Options de traitement
-                st.write("**Traitement des anomalies :**")
-                handle_outliers = st.selectbox(
-                    "Action sur les anomalies :",
-                    ["Aucune", "Marquer", "Supprimer", "Remplacer par médiane"]
-                )
-                
-                if st.button("Appliquer le traitement"):
-                    if handle_outliers == "Supprimer":
-                        for col in numerical_columns:
-                            Q1 = data[col].quantile(0.25)
-                            Q3 = data[col].quantile(0.75)
-                            IQR = Q3 - Q1
-                            lower_bound = Q1 - 1.5 * IQR
-                            upper_bound = Q3 + 1.5 * IQR
-                            data = data[(data[col] >= lower_bound) & (data[col] <= upper_bound)]
-                        st.success("Anomalies supprimées avec succès")
-            
-            st.markdown('</div>', unsafe_allow_html=True)
+        if detect_outliers and profile.numeric_columns:
+            outliers_section(data, data_key, profile, sketch)
+            treatment = st.session_state.get('outlier_treatment')
+            if treatment is not None and treatment['key'] == data_key:
+                with stage("Traitement des anomalies", len(data)):
+                    data, data_key = treat_outliers(data, data_key, profile.numeric_columns, sketch,
+                                                    treatment['action'])
+                    profile = get_profile(data, data_key)
 
         # --- Filtrage interactif avancé ---
         st.markdown('<div class="modern-card">', unsafe_allow_html=True)
@@ -466,110 +1009,68 @@ if uploaded_file is not None:
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            filter_cols = st.multiselect("Colonnes à filtrer :", data.columns)
-            filtered_data = data.copy()
+            filter_cols = st.multiselect("Colonnes à filtrer :", data.columns, key='filter_cols')
+            # `data` reste intact : les index par colonne sont construits à la première utilisation
+            filter_engine = get_filter_engine(data, data_key)
+            predicates = []
             
             for col in filter_cols:
-                if data[col].dtype == 'object' or str(data[col].dtype).startswith('category'):
-                    options = filtered_data[col].dropna().unique().tolist()
+                if not is_range_column(data[col]):
+                    options = filter_engine.categories(col)
                     selected = st.multiselect(f"Valeurs pour **{col}**", options, key=f"cat_{col}")
                     if selected:
-                        filtered_data = filtered_data[filtered_data[col].isin(selected)]
+                        predicates.append(('isin', col, tuple(selected)))
                 else:
-                    min_val, max_val = float(filtered_data[col].min()), float(filtered_data[col].max())
-                    val_range = st.slider(f"Plage pour **{col}**", min_val, max_val, (min_val, max_val), key=f"num_{col}")
-                    filtered_data = filtered_data[(filtered_data[col] >= val_range[0]) & (filtered_data[col] <= val_range[1])]
+                    min_val, max_val = filter_engine.value_range(col)
+                    # Plage par défaut posée dans l'état : une vue restaurée peut la remplacer sans conflit
+                    st.session_state.setdefault(f"num_{col}", (min_val, max_val))
+                    val_range = st.slider(f"Plage pour **{col}**", min_val, max_val, key=f"num_{col}")
+                    predicates.append(('range', col, val_range[0], val_range[1]))
+            
+            # Vue légère (positions de lignes) consommée sans copie par les sections suivantes
+            with stage("Filtrage", len(data)):
+                saved_view = st.session_state.get('saved_view')
+                saved_positions = None
+                if predicates and saved_view is not None and saved_view['key'] == data_key \
+                        and saved_view['predicates'] == predicates:
+                    # Vue sauvegardée rétablie : positions relues dans le cache partagé
+                    saved_positions = get_shared_cache().get(saved_view['view'])
+                if saved_positions is not None:
+                    filtered_view = FilteredView(data, saved_positions, saved_view['view'][2])
+                else:
+                    filtered_view = filter_engine.apply(predicates)
         
         with col2:
             st.write("**Résultats du filtrage :**")
-            st.metric("Lignes filtrées", filtered_data.shape[0])
-            st.metric("Colonnes", filtered_data.shape[1])
-            reduction = ((data.shape[0] - filtered_data.shape[0]) / data.shape[0]) * 100
+            st.metric("Lignes filtrées", filtered_view.n_rows)
+            st.metric("Colonnes", filtered_view.shape[1])
+            reduction = ((data.shape[0] - filtered_view.n_rows) / data.shape[0]) * 100
             st.metric("Réduction", f"{reduction:.1f}%")
+            st.metric("Doublons (vue)", get_row_index(data, data_key).duplicates_among(filtered_view.positions))
             
-            # Sauvegarde du jeu de données filtré
+            # Sauvegarde de la vue : positions de lignes dans le cache partagé, conservées par la session
             if st.button("💾 Sauvegarder cette vue"):
-                st.session_state['filtered_data'] = filtered_data
+                view_key = ('view', data_key, filtered_view.key)
+                get_shared_cache().put(view_key, filtered_view.positions)
+                get_shared_cache().hold(session_id, 'saved_view', view_key)
+                st.session_state['saved_view'] = {'key': data_key, 'view': view_key,
+                                                  'columns': list(filter_cols), 'predicates': predicates}
                 st.success("Vue sauvegardée !")
+            saved_view = st.session_state.get('saved_view')
+            if saved_view is not None and saved_view['key'] == data_key:
+                st.button("↩️ Restaurer la vue sauvegardée", on_click=restore_view, args=(saved_view,))
         
-        st.success(f"**📊 Données filtrées :** {filtered_data.shape[0]} lignes × {filtered_data.shape[1]} colonnes")
-        st.dataframe(filtered_data.head(10), use_container_width=True)
+        st.success(f"**📊 Données filtrées :** {filtered_view.n_rows} lignes × {filtered_view.shape[1]} colonnes")
+        st.dataframe(filtered_view.head(10), use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
 
-        # --- Machine Learning & Clustering ---
-        if ml_enabled and clustering_enabled and len(data.select_dtypes(include='number').columns) >= 2:
-            st.markdown('<div class="modern-card">', unsafe_allow_html=True)
-            st.markdown('<div class="card-title">🤖 Machine Learning - Clustering</div>', unsafe_allow_html=True)
-            
-            numerical_columns = st.multiselect(
-                "Sélectionnez les colonnes pour le clustering :",
-                data.select_dtypes(include='number').columns.tolist(),
-                default=data.select_dtypes(include='number').columns.tolist()[:2]
-            )
-            
-            if len(numerical_columns) >= 2:
-                n_clusters = st.slider("Nombre de clusters :", 2, 10, 3)
-                
-                if st.button("🔍 Exécuter le Clustering"):
-                    try:
-                        clusters, kmeans = perform_clustering(data, numerical_columns, n_clusters)
-                        data['Cluster'] = clusters
-                        
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.write("**Répartition des clusters :**")
-                            cluster_counts = pd.Series(clusters).value_counts().sort_index()
-                            for cluster, count in cluster_counts.items():
-                                st.write(f"Cluster {cluster} : {count} éléments ({count/len(data)*100:.1f}%)")
-                        
-                        with col2:
-                            if PLOTLY_AVAILABLE:
-                                fig = px.scatter(
-                                    data, x=numerical_columns[0], y=numerical_columns[1],
-                                    color=clusters, title="Visualisation des Clusters",
-                                    color_continuous_scale='viridis'
-                                )
-                                st.plotly_chart(fig, use_container_width=True)
-                        
-                        st.success("Clustering terminé avec succès !")
-                    except Exception as e:
-                        st.error(f"Erreur lors du clustering : {e}")
-            
-            st.markdown('</div>', unsafe_allow_html=True)
 
-        # --- Analyse temporelle ---
-        date_columns = [col for col in data.columns if 'date' in col.lower() or 'time' in col.lower()]
-        if forecasting_enabled and date_columns:
-            st.markdown('<div class="modern-card">', unsafe_allow_html=True)
-            st.markdown('<div class="card-title">📈 Analyse Temporelle</div>', unsafe_allow_html=True)
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                date_col = st.selectbox("Colonne de date :", date_columns)
-            with col2:
-                value_col = st.selectbox("Colonne de valeurs :", data.select_dtypes(include='number').columns)
-            
-            if date_col and value_col:
-                stats, ts_data = time_series_forecast(data, date_col, value_col)
-                if stats:
-                    st.write("**Analyse de la série temporelle :**")
-                    col1, col2, col3, col4 = st.columns(4)
-                    with col1:
-                        st.metric("Tendance", stats['trend'])
-                    with col2:
-                        st.metric("Volatilité", f"{stats['volatility']:.2f}")
-                    with col3:
-                        st.metric("Dernière valeur", f"{stats['last_value']:.2f}")
-                    with col4:
-                        st.metric("Taux croissance", f"{stats['growth_rate']:.1f}%")
-                    
-                    if PLOTLY_AVAILABLE and ts_data is not None:
-                        fig = px.line(ts_data, x=ts_data.index, y=value_col, title=f"Évolution de {value_col}")
-                        st.plotly_chart(fig, use_container_width=True)
-            
-            st.markdown('</div>', unsafe_allow_html=True)
+        if ml_enabled and clustering_enabled and len(profile.numeric_columns) >= 2:
+            clustering_section(data, data_key, profile)
+
+        if forecasting_enabled and profile.datetime_columns:
+            time_series_section(data, data_key, profile)
 
-        # --- Visualisations interactives avancées ---
         if PLOTLY_AVAILABLE:
             st.markdown('<div class="modern-card">', unsafe_allow_html=True)
             st.markdown('<div class="card-title">📊 Visualisations Avancées</div>', unsafe_allow_html=True)
@@ -577,68 +1078,7 @@ if uploaded_file is not None:
             viz_tab1, viz_tab2, viz_tab3 = st.tabs(["📈 Graphiques standards", "🔄 Graphiques avancés", "📋 Tableaux croisés"])
             
             with viz_tab1:
-                viz_col1, viz_col2 = st.columns([1, 2])
-                
-                with viz_col1:
-                    plot_type = st.selectbox("Type de visualisation :", 
-                                           ["Histogramme", "Boxplot", "Scatter Plot", "Line Chart", "Bar Chart", "Pie Chart", "Heatmap"])
-                    
-                    numeric_cols = filtered_data.select_dtypes(include='number').columns.tolist()
-                    cat_cols = filtered_data.select_dtypes(include=['object', 'category']).columns.tolist()
-                    
-                    if plot_type in ["Histogramme", "Boxplot"] and numeric_cols:
-                        selected_col = st.selectbox("Colonne numérique :", numeric_cols)
-                    elif plot_type == "Scatter Plot" and len(numeric_cols) >= 2:
-                        x_col = st.selectbox("Axe X :", numeric_cols)
-                        y_col = st.selectbox("Axe Y :", [c for c in numeric_cols if c != x_col])
-                    elif plot_type == "Pie Chart" and cat_cols:
-                        selected_col = st.selectbox("Colonne catégorielle :", cat_cols)
-                    elif plot_type == "Heatmap" and len(numeric_cols) >= 2:
-                        st.write("Heatmap des corrélations")
-                
-                with viz_col2:
-                    try:
-                        soft_colors = ['#3498db', '#2ecc71', '#e74c3c', '#f39c12', '#9b59b6', '#1abc9c']
-                        
-                        if plot_type == "Histogramme" and numeric_cols:
-                            fig = px.histogram(filtered_data, x=selected_col, 
-                                             title=f"Distribution de {selected_col}",
-                                             color_discrete_sequence=['#3498db'])
-                            fig.update_layout(plot_bgcolor='white', paper_bgcolor='white')
-                            st.plotly_chart(fig, use_container_width=True)
-                        
-                        elif plot_type == "Boxplot" and numeric_cols:
-                            fig = px.box(filtered_data, y=selected_col, 
-                                       title=f"Boxplot de {selected_col}",
-                                       color_discrete_sequence=['#2ecc71'])
-                            fig.update_layout(plot_bgcolor='white', paper_bgcolor='white')
-                            st.plotly_chart(fig, use_container_width=True)
-                        
-                        elif plot_type == "Scatter Plot" and len(numeric_cols) >= 2:
-                            fig = px.scatter(filtered_data, x=x_col, y=y_col,
-                                           title=f"{x_col} vs {y_col}",
-                                           color_discrete_sequence=['#e74c3c'])
-                            fig.update_layout(plot_bgcolor='white', paper_bgcolor='white')
-                            st.plotly_chart(fig, use_container_width=True)
-                        
-                        elif plot_type == "Pie Chart" and cat_cols:
-                            pie_data = filtered_data[selected_col].value_counts().head(10)
-                            fig = px.pie(values=pie_data.values, names=pie_data.index,
-                                       title=f"Répartition de {selected_col}",
-                                       color_discrete_sequence=soft_colors)
-                            fig.update_layout(plot_bgcolor='white', paper_bgcolor='white')
-                            st.plotly_chart(fig, use_container_width=True)
-                        
-                        elif plot_type == "Heatmap" and len(numeric_cols) >= 2:
-                            corr_matrix = filtered_data[numeric_cols].corr()
-                            fig = px.imshow(corr_matrix, 
-                                          title="Matrice de corrélations",
-                                          color_continuous_scale='RdBu_r',
-                                          aspect='auto')
-                            st.plotly_chart(fig, use_container_width=True)
-                        
-                    except Exception as e:
-                        st.warning(f"Impossible de générer la visualisation : {e}")
+                charts_section(filtered_view, data_key, profile, sketch)
             
             with viz_tab2:
                 st.write("**Graphiques avancés**")
@@ -647,80 +1087,11 @@ if uploaded_file is not None:
                 st.info("Fonctionnalités avancées en développement...")
             
             with viz_tab3:
-                st.write("**Tableaux croisés dynamiques**")
-                if len(cat_cols) >= 2:
-                    row_col = st.selectbox("Lignes :", cat_cols)
-                    col_col = st.selectbox("Colonnes :", cat_cols)
-                    value_col = st.selectbox("Valeurs :", numeric_cols) if numeric_cols else None
-                    
-                    if row_col and col_col:
-                        pivot_table = pd.pivot_table(
-                            filtered_data, 
-                            values=value_col if value_col else None,
-                            index=row_col, 
-                            columns=col_col,
-                            aggfunc='count' if not value_col else 'mean'
-                        )
-                        st.dataframe(pivot_table, use_container_width=True)
+                pivot_section(filtered_view, data_key, profile)
             
             st.markdown('</div>', unsafe_allow_html=True)
 
-        # --- Export et reporting avancé ---
-        st.markdown('<div class="modern-card">', unsafe_allow_html=True)
-        st.markdown('<div class="card-title">💾 Export & Reporting Avancé</div>', unsafe_allow_html=True)
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.write("**Export des données :**")
-            csv = filtered_data.to_csv(index=False).encode('utf-8')
-            st.download_button("📥 Télécharger CSV", 
-                             data=csv, 
-                             file_name="donnees_analysees.csv",
-                             mime="text/csv")
-        
-        with col2:
-            excel_buffer = io.BytesIO()
-            with pd.ExcelWriter(excel_buffer, engine='xlsxwriter') as writer:
-                filtered_data.to_excel(writer, index=False, sheet_name='Données')
-                if 'Cluster' in data.columns:
-                    data.to_excel(writer, index=False, sheet_name='Avec_Clusters')
-            st.download_button("📥 Télécharger Excel",
-                             data=excel_buffer.getvalue(),
-                             file_name="analyse_complete.xlsx",
-                             mime="application/vnd.ms-excel")
-        
-        with col3:
-            st.write("**Rapport d'analyse :**")
-            if st.button("📄 Générer le rapport"):
-                # Génération d'un rapport sommaire
-                report = f"""
-                RAPPORT D'ANALYSE - HevitraVizor+
-                =================================
-                
-                Date de génération : {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-                Fichier source : {uploaded_file.name}
-                
-                MÉTRIQUES PRINCIPALES :
-                - Lignes : {data.shape[0]}
-                - Colonnes : {data.shape[1]}
-                - Données manquantes : {data.isnull().sum().sum()} ({missing_percentage:.1f}%)
-                - Colonnes numériques : {len(data.select_dtypes(include='number').columns)}
-                - Colonnes catégorielles : {len(data.select_dtypes(include=['object', 'category']).columns)}
-                
-                INSIGHTS :
-                {chr(10).join(insights)}
-                
-                Ce rapport a été généré automatiquement par HevitraVizor+.
-                """
-                
-                st.text_area("Rapport généré :", report, height=300)
-                st.download_button("📥 Télécharger le rapport",
-                                 data=report,
-                                 file_name="rapport_analyse.txt",
-                                 mime="text/plain")
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+        export_section(data, data_key, filtered_view, profile, insights, uploaded_file.name)
 
     except Exception as e:
         st.error(f"❌ Erreur lors du traitement des données : {str(e)}")
@@ -758,18 +1129,19 @@ else:
         
         # Démonstration avec des données d'exemple
         st.markdown("### 🎯 Démarrage Rapide")
+        with st.expander("⚙️ Paramètres du jeu d'exemple"):
+            example_rows = st.select_slider("Lignes", options=[100, 1_000, 10_000, 100_000], value=100)
+            example_columns = st.number_input("Colonnes", min_value=6, max_value=50, value=6)
+            example_nulls = st.slider("Valeurs manquantes (%)", 0.0, 20.0, 0.0, 0.5)
+            example_duplicates = st.slider("Doublons (%)", 0.0, 20.0, 0.0, 0.5)
+            example_outliers = st.slider("Valeurs aberrantes (%)", 0.0, 10.0, 0.0, 0.5)
         if st.button("🚀 Charger des données d'exemple"):
             # Créer des données d'exemple
-            np.random.seed(42)
-            example_data = pd.DataFrame({
-                'Date': pd.date_range('2023-01-01', periods=100),
-                'Ventes': np.random.normal(1000, 200, 100).cumsum(),
-                'Clients': np.random.randint(50, 150, 100),
-                'Region': np.random.choice(['Nord', 'Sud', 'Est', 'Ouest'], 100),
-                'Produit': np.random.choice(['A', 'B', 'C', 'D'], 100),
-                'Satisfaction': np.random.randint(1, 6, 100)
-            })
-            
+            example_data = generate_dataset(
+                example_rows, n_columns=example_columns, null_rate=example_nulls / 100,
+                duplicate_rate=example_duplicates / 100, outlier_rate=example_outliers / 100,
+            )
+
             # Sauvegarder en CSV virtuel
             csv = example_data.to_csv(index=False)
             st.download_button(
@@ -823,6 +1195,55 @@ else:
             - **Encodages** : UTF-8, Latin-1, etc.
             """)
 
+# --- Administration : mémoire du cache partagé (URL avec ?admin) ---
+if 'admin' in st.query_params:
+    with st.sidebar.expander("🛠️ Mémoire partagée", expanded=True):
+        cache = get_shared_cache()
+        cache_stats = cache.stats()
+        st.progress(min(cache_stats['bytes'] / cache_stats['max_bytes'], 1.0),
+                    text=f"{cache_stats['bytes'] / 1024 ** 2:.1f} Mo / {cache_stats['max_bytes'] / 1024 ** 2:.0f} Mo")
+        st.caption(f"{cache_stats['entries']} entrées • {cache_stats['pinned_bytes'] / 1024 ** 2:.1f} Mo référencés • "
+                   f"{cache_stats['hits']} succès / {cache_stats['misses']} défauts • "
+                   f"{cache_stats['evictions']} évictions")
+        st.write("**Par type de résultat :**")
+        st.dataframe(pd.DataFrame(
+            [{'Type': kind, 'Entrées': entries, 'Mo': total / 1024 ** 2, 'Mo référencés': pinned / 1024 ** 2}
+             for kind, (entries, total, pinned) in cache.usage_by_kind().items()]
+        ), use_container_width=True, hide_index=True)
+        st.write(f"**Sessions actives : {cache_stats['sessions']}**")
+        st.dataframe(pd.DataFrame(
+            [{'Session': row['session'][:8] + (' (vous)' if row['session'] == session_id else ''),
+              'Entrées': row['entries'], 'Mo référencés': row['bytes'] / 1024 ** 2,
+              'Mo attribués': row['shared_bytes'] / 1024 ** 2, 'Mo exclusifs': row['exclusive_bytes'] / 1024 ** 2,
+              'Inactive (s)': round(row['idle'])}
+             for row in cache.session_stats()]
+        ), use_container_width=True, hide_index=True)
+
+# --- Performance : durée, lignes et mémoire par étape ---
+with st.sidebar.expander("⏱️ Performance"):
+    recorder = get_recorder()
+    last_run = recorder.last_run(session_id)
+    if last_run:
+        st.write(f"**Dernière exécution : {sum(r.seconds for r in last_run if r.depth == 0) * 1000:.0f} ms**")
+        st.dataframe(pd.DataFrame(
+            [{'Étape': '  ' * r.depth + ('└ ' if r.depth else '') + r.name, 'Durée (ms)': r.seconds * 1000,
+              'Lignes': r.rows, 'Mémoire (Mo)': r.memory / 1024 ** 2}
+             for r in last_run]
+        ), use_container_width=True, hide_index=True)
+    stage_summary = recorder.summary()
+    if stage_summary:
+        st.write("**Depuis le démarrage (toutes sessions) :**")
+        st.dataframe(pd.DataFrame(
+            [{'Étape': name, 'Appels': values['count'], 'Moyenne (ms)': values['mean_seconds'] * 1000,
+              'p95 (ms)': values['p95_seconds'] * 1000, 'Max (ms)': values['max_seconds'] * 1000}
+             for name, values in stage_summary.items()]
+        ), use_container_width=True, hide_index=True)
+        col_json, col_prom = st.columns(2)
+        col_json.download_button("📥 JSON", data=recorder.to_json(session_id),
+                                 file_name="performance.json", mime="application/json")
+        col_prom.download_button("📥 Prometheus", data=recorder.to_prometheus(),
+                                 file_name="performance.prom", mime="text/plain")
+
 # --- Footer étendu ---
 st.markdown("---")
 st.markdown(